@@ -1,4 +1,3 @@
-import pygame
 from pygame.sprite import Sprite
 
 
@@ -13,8 +12,8 @@ class Alien(Sprite):
         # get setting from main game to access attributes
         self.settings = ai_game.settings
 
-        # Load alien image and set rect attribute
-        self.image = pygame.image.load("Images/alien.bmp")
+        # Get shared alien image from asset cache and set rect attribute
+        self.image = ai_game.assets.get_image("Images/alien.bmp")
         self.rect = self.image.get_rect()
 
         # Start each new alien near top left of screen
@@ -24,20 +23,27 @@ class Alien(Sprite):
 
         # Store alien exact position
         self.x = float(self.rect.x)
-
-    # check for alien collision with wall
-    def check_edges(self):
-        """Return True if alien is at edge of screen"""
-        screen_rect = self.screen.get_rect()
-        # if alien is at either edge of sceen
-        if self.rect.right >= screen_rect.right or self.rect.left <= 0:
-            return True
-
-    # update alien position to move
-    def update(self):
-        """Move alien to the right or left"""
-        # alien position change either left or right
-        self.x += (self.settings.alien_speed
-                   * self.settings.fleet_direction)
-        # set x position to rect x position to update alien position
-        self.rect.x = self.x
+        # index of alien in layout slots, column and row of alien in fleet grid
+        # set when fleet is created
+        self.slot = None
+        self.col = None
+        self.row = None
+        # alien_points are multiplied by this when alien is shot
+        self.points = 1
+        # walk frames of alien kind from atlas and atlas row of the kind
+        # fleet picks the frame to draw, so aliens keep no animation timers
+        self.frames = (self.image,)
+        self.kind = 0
+
+    def place(self, slot, col, row, x, y, frames, kind, points):
+        """Move pooled alien to layout slot at column and row at x, y, used when fleet is spawned"""
+        self.slot = slot
+        self.frames = frames
+        self.image = frames[0]
+        self.kind = kind
+        self.x = float(x)
+        self.rect.x = x
+        self.rect.y = y
+        self.col = col
+        self.row = row
+        self.points = points
@@ -0,0 +1,188 @@
+import random  # Tools used to seed random numbers
+import numpy as np
+import pygame
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion  # use main game module
+
+# actions agents pick from, index of the action is passed to step()
+ACTIONS = ((), ("left",), ("right",), ("fire",), ("left", "fire"), ("right", "fire"))
+
+
+class AlienInvasionEnv:
+    """Reinforcement learning environment around one headless game
+
+    reset() starts a new game and step(action) runs frame_skip ticks with one
+    action from ACTIONS. Observations are NumPy arrays, either a compact state
+    vector ("state") or a downsampled copy of the screen ("pixels").
+
+    State vector layout, all values scaled to 0..1:
+    ship x, up to bullets_allowed bullet (x, y) pairs (0 when unused), then
+    x, y and alive flag of every alien slot of the fleet layout.
+    """
+
+    def __init__(self, settings=None, observation="state", frame_skip=4,
+                 pixel_step=4, seed=None):
+        """Create headless game for the environment"""
+        if settings is None:
+            settings = Settings()
+            # numpy fleet keeps alien positions in arrays that are copied straight into observations
+            settings.fleet_backend = "numpy"
+        # pauses only waste steps for an agent
+        settings.skip_pauses = True
+        # pixel observations need the whole screen drawn every step
+        settings.render_mode = "full"
+        self.settings = settings
+        self.observation = observation
+        self.frame_skip = frame_skip
+        self.pixel_step = pixel_step
+        self.game = AlienInvasion(headless=True, settings=settings, seed=seed)
+        self.width = settings.screen_width
+        self.height = settings.screen_height
+        self.game.step(("play",))
+        # number of alien slots in fleet layout, same for every wave on this screen
+        num_alien_x, num_row = self.game.fleet_size
+        self.alien_slots = num_alien_x * num_row
+        self.observation_shape = self._observation_shape()
+        self.last_score = 0
+
+    def _observation_shape(self):
+        """Return shape of observation arrays"""
+        if self.observation == "pixels":
+            return (len(range(0, self.width, self.pixel_step)),
+                    len(range(0, self.height, self.pixel_step)), 3)
+        return (1 + 2 * self.settings.bullets_allowed + 3 * self.alien_slots,)
+
+    def reset(self, seed=None):
+        """Start a new game and return first observation"""
+        if seed is not None:
+            self.game.seed = seed
+            random.seed(seed)
+        self.game.stats.game_active = False
+        self.game.step(("play",))
+        self.last_score = 0
+        return self.observe()
+
+    def step(self, action):
+        """Run frame_skip ticks with action, return observation, reward, done and info"""
+        reward, done = self.advance(action)
+        return self.observe(), reward, done, self.info()
+
+    def advance(self, action):
+        """Run frame_skip ticks with action without observing, return reward and done"""
+        game = self.game
+        actions = ACTIONS[action]
+        game.step(actions)
+        # fire only on first tick, movement is held for the remaining ticks in one call
+        if self.frame_skip > 1:
+            game.step(tuple(name for name in actions if name != "fire"), self.frame_skip - 1)
+        # reward is score gained since last step
+        reward = game.stats.score - self.last_score
+        self.last_score = game.stats.score
+        return reward, not game.stats.game_active
+
+    def info(self):
+        """Return dictionary with score, level, ships left and ticks of the game"""
+        stats = self.game.stats
+        return {"score": stats.score, "level": stats.level,
+                "ships_left": stats.ships_left, "ticks": self.game.tick_count}
+
+    def observe(self, out=None):
+        """Return observation of current game, written into out if it is given"""
+        if out is None:
+            out = np.empty(self.observation_shape,
+                           dtype=np.uint8 if self.observation == "pixels" else np.float32)
+        if self.observation == "pixels":
+            self._observe_pixels(out)
+        else:
+            self._observe_state(out)
+        return out
+
+    def _observe_pixels(self, out):
+        """Draw screen and copy every pixel_step-th pixel into out"""
+        self.game._update_screen()
+        # pixels3d() is a view of the screen memory, slicing it copies nothing
+        view = pygame.surfarray.pixels3d(self.game.screen)
+        out[...] = view[::self.pixel_step, ::self.pixel_step]
+        # drop view so screen is unlocked before it is drawn again
+        del view
+
+    def _observe_state(self, out):
+        """Write ship, bullet and alien positions into out"""
+        game = self.game
+        out[:] = 0
+        out[0] = game.ship.x / self.width
+        # bullets in firing order
+        for i, bullet in enumerate(game.bullets):
+            if i >= self.settings.bullets_allowed:
+                break
+            out[1 + 2 * i] = bullet.rect.x / self.width
+            out[2 + 2 * i] = bullet.rect.y / self.height
+        start = 1 + 2 * self.settings.bullets_allowed
+        slots = self.alien_slots
+        aliens = game.aliens
+        if game.array_fleet:
+            # fleet knows layout slot of every alien, formations can leave slots empty
+            # dead aliens stay zero and x is rounded like rect.x, same as sprite fleet
+            index = start + aliens.slots
+            alive = aliens.alive
+            out[index] = aliens._rect_x() * alive / self.width
+            out[index + slots] = aliens.y * alive / self.height
+            out[index + 2 * slots] = alive
+        else:
+            num_alien_x = game.fleet_size[0]
+            for alien in aliens.sprites():
+                slot = alien.row * num_alien_x + alien.col
+                if slot < slots:
+                    out[start + slot] = alien.rect.x / self.width
+                    out[start + slots + slot] = alien.rect.y / self.height
+                    out[start + 2 * slots + slot] = 1
+
+
+class VectorAlienInvasionEnv:
+    """Environment that steps many independent games in one call
+
+    Observations, rewards and done flags of all games are written into arrays
+    that are allocated once. A game that ends is reset at once and its new
+    first observation is returned, like gym vector environments do.
+
+    Games are Python objects, so every game still runs its own ticks one game
+    after another with the same rules as AlienInvasionEnv.step(). Batching
+    removes the per-step allocation of observations and results and runs the
+    frame skip ticks in one call, it does not remove the per-tick cost of each
+    game. Run environments in several processes to use more cores.
+    """
+
+    def __init__(self, num_envs, settings_factory=None, observation="state",
+                 frame_skip=4, pixel_step=4, seed=0):
+        """Create num_envs games, settings_factory returns Settings for each game"""
+        self.envs = [AlienInvasionEnv(settings_factory() if settings_factory else None,
+                                      observation, frame_skip, pixel_step, seed + i)
+                     for i in range(num_envs)]
+        shape = self.envs[0].observation_shape
+        dtype = np.uint8 if observation == "pixels" else np.float32
+        self.observations = np.zeros((num_envs,) + shape, dtype=dtype)
+        self.rewards = np.zeros(num_envs, dtype=np.float64)
+        self.dones = np.zeros(num_envs, dtype=bool)
+
+    def reset(self):
+        """Start new games and return observations of all of them"""
+        for i, env in enumerate(self.envs):
+            env.reset()
+            env.observe(self.observations[i])
+        return self.observations
+
+    def step(self, actions):
+        """Step every game with its action, return observations, rewards, dones and infos
+
+        Returned arrays are reused by the next call, copy them to keep them
+        """
+        infos = []
+        for i, (env, action) in enumerate(zip(self.envs, actions)):
+            self.rewards[i], done = env.advance(action)
+            self.dones[i] = done
+            # info describes the game that just ended, before it is reset
+            infos.append(env.info())
+            if done:
+                env.reset()
+            env.observe(self.observations[i])
+        return self.observations, self.rewards, self.dones, infos
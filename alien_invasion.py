@@ -1,23 +1,92 @@
+import os  # Tools used to pick SDL video driver
+import random  # Tools used to seed random numbers
+from math import ceil, floor  # Tools used to round swept ship area outwards
+from time import perf_counter  # Tools used to time phases of each frame
+# time modules started loading, startup report shows how long importing pygame took
+_import_start = perf_counter()
 import sys  # Tools used to exit game when player quits
-from time import sleep  # Tools used to pause game
 import pygame  # Contain functionality to create a game
 from settings import Settings  # Use settings module
 from ship import Ship  # Use ship module
-from bullet import Bullet  # Use bullet module
-from alien import Alien  # use alien module
+from bullet import BulletPool  # Use bullet module
+from fleet import Fleet  # use fleet module
 from game_stats import GameStats  # use game_stats module
 from button import Button  # use button module
 from scoreboard import Scoreboard  # use scoreboard module
+from assets import Assets  # use assets module
+from renderer import Renderer, RenderQueue  # use renderer module
+from leaderboard import Leaderboard  # use leaderboard module
+from atlas import AlienAtlas  # use atlas module
+from explosion import Explosions  # use explosion module
+from waves import fleet_layout  # use waves module
+import profiler  # use profiler module
+_import_seconds = perf_counter() - _import_start
+
+# game states while game is active
+# aliens and bullets only move while playing, other states wait for their timer to run out
+PLAYING = "playing"
+# pause for regrouping after ship is hit, new fleet arrives when it ends
+SHIP_HIT = "ship_hit"
+# pause after fleet is destroyed, next level starts when it ends
+LEVEL_UP = "level_up"
+
+# events that are player input, input latency is measured from when they are read
+INPUT_EVENTS = (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN)
 
 
 class AlienInvasion:
     """Overall class to manage game assets and behaviour"""
 
-    def __init__(self):
-        """Initialize game and create game resources"""
-        # Initialize background setting needed for pygame to work
-        pygame.init()
-        self.settings = Settings()
+    def __init__(self, headless=False, settings=None, seed=None, recorder=None, leaderboard=True):
+        """Initialize game and create game resources
+
+        headless=True runs the game without a window, nothing is drawn and
+        the game is driven with step() instead of Run_Game()
+        settings replaces default Settings, seed seeds random numbers and
+        recorder (replay.Recorder) records player input of the session
+        leaderboard=False does not save finished games, used by games that
+        only show a game played before or elsewhere
+        """
+        # time of every startup step, printed with --startup-report
+        self.startup = profiler.StartupTimer()
+        # headless game has no window and skips all drawing
+        self.headless = headless
+        # Initialize only the parts of pygame the game uses
+        # pygame.init() would also start audio and joysticks, which the game never uses
+        if self.headless and not pygame.display.get_init():
+            # dummy video driver lets pygame create surfaces without opening a window
+            # driver is only read when display starts, so the previous value is put back after
+            driver = os.environ.get("SDL_VIDEODRIVER")
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            try:
+                pygame.display.init()
+            finally:
+                if driver is None:
+                    del os.environ["SDL_VIDEODRIVER"]
+                else:
+                    os.environ["SDL_VIDEODRIVER"] = driver
+        else:
+            pygame.display.init()
+        pygame.font.init()
+        self.startup.mark("pygame init")
+        self.settings = settings if settings is not None else Settings()
+        # images are read from disk while the window opens
+        # aliens, ship and scoreboard share these surfaces instead of reading from disk
+        self.assets = Assets()
+        self.assets.load_in_background("Images/alien.bmp", "Images/ship.bmp")
+        # same seed gives same random numbers so sessions can be replayed
+        self.seed = seed
+        if seed is not None:
+            random.seed(seed)
+        # records input for replay, None when session is not recorded
+        self.recorder = recorder
+        if self.recorder is not None:
+            self.recorder.start(self)
+        # number of simulation ticks run so far, input is recorded against it
+        self.tick_count = 0
+        # current game state and seconds left until it ends
+        self.state = PLAYING
+        self.state_timer = 0.0
         # self.screen creates a display window to draw all game graphic elements
         # argument is a tuple that define dimensions of game window
         # self.screen is a surface (surface - part of the screen where game elements are displayed)
@@ -25,42 +94,189 @@ class AlienInvasion:
             (self.settings.screen_width, self.settings.screen_height))
         # Displays caption "Alien Invasion"
         pygame.display.set_caption("Alien Invasion")
+        self.startup.mark("window")
         # create instance to store game stats, Gamestats can now access AlienInvasion class
         self.stats = GameStats(self)
+        # create play button
+        self.play_button = Button(self, "Play")
+        # show play screen at once, the rest of the game is ready before first click can arrive
+        if not self.headless:
+            self.screen.fill(self.settings.bg_color)
+            queue = RenderQueue()
+            self.play_button.enqueue(queue)
+            queue.flush(self.screen)
+            pygame.display.flip()
+        self.startup.mark("first frame")
+        # convert images now that the screen exists, waits for loader thread if it is not done
+        self.assets.preload("Images/alien.bmp", "Images/ship.bmp")
+        # animation frames of alien kinds in one surface, drawn when a wave first uses a kind
+        self.atlas = AlienAtlas(self)
+        self.startup.mark("images")
         # create scoreboard which refers to main game
         self.sb = Scoreboard(self)
         # Instance of ship is created after the screen is created
         # Ship() takes 1 parameter self, which refers to current instance of main game
         # The ship can now access properties from AlienInvasion class
         self.ship = Ship(self)
-        # create a group (list) to store any live bullets that would get deleted
-        self.bullets = pygame.sprite.Group()
-        # create a group to store aliens
-        self.aliens = pygame.sprite.Group()
+        # create a pool to store any live bullets, bullets are reused when they get deleted
+        self.bullets = BulletPool(self)
+        # aliens shot by bullets explode for a moment
+        self.explosions = Explosions(self)
+        # create a group to store aliens, group keeps track of fleet bounding box
+        # numpy backend keeps fleet in arrays instead of one sprite per alien
+        self.array_fleet = self.settings.fleet_backend == "numpy"
+        if self.array_fleet:
+            # numpy is only needed when this backend is used
+            from array_fleet import ArrayFleet
+            self.aliens = ArrayFleet(self)
+        else:
+            self.aliens = Fleet(self)
         # create fleet of aliens
         self._create_fleet()
-        # create play button
-        self.play_button = Button(self, "Play")
+        self.startup.mark("game objects")
+        # clears screen and makes drawn frames visible
+        self.renderer = Renderer(self)
+        # times each phase of every frame, F3 shows timings and F4 saves them to CSV
+        self.profiler = profiler.FrameProfiler(self)
+        # saves finished games on a background thread, simulated games are not saved
+        self.leaderboard = None if self.headless or not leaderboard else Leaderboard(self)
+        # time oldest input not shown on screen yet was read, used to measure input latency
+        self.input_time = None
+        # True prints input latency and tick rate when game quits
+        self.report_latency = False
+        self.startup.mark("ready")
+
+    def startup_report(self):
+        """Return text with time spent importing modules and on every startup step"""
+        return (f"{'import':<16}{_import_seconds * 1000:8.2f} ms\n"
+                + self.startup.report())
 
     def Run_Game(self):
         """Start main loop of the game (game loop)"""
+        if self.settings.pipeline:
+            # simulation runs on its own thread, this thread reads input and draws
+            from pipeline import PipelinedLoop
+            PipelinedLoop(self).run()
+            return
+        # clock caps how often the screen is drawn so one core is not pinned at 100%
+        clock = pygame.time.Clock()
+        # length of one simulation tick in seconds
+        dt = 1 / self.settings.tick_rate
+        # time that has passed but has not been simulated yet
+        accumulator = 0.0
         # While loop used runs continuously and manage screen updates
         while True:
+            # tick() waits so the loop runs at most max_fps and returns milliseconds since last frame
+            frame_time = clock.tick(self.settings.max_fps) / 1000
+            # after a long stall only catch up a limited amount of time
+            accumulator += min(frame_time, self.settings.max_frame_time)
+
             # Helper method used only to help the class not to be called through an instance
             # Access respond to events method
+            start = perf_counter()
             self._check_events()
+            self._check_leaderboard()
+            self.profiler.lap(profiler.EVENTS, start)
 
-            # if game is active mainloop should run
-            if self.stats.game_active:
-                # Position of ship is updated after event is checked before screen is updated
-                self.ship.update()
-                # update bullet position
-                self._update_bullets()
-                # update alien position
-                self._update_aliens()
+            # run as many fixed ticks as needed to catch up with real time
+            # game speed is the same on every machine, slow frames just skip drawing
+            while accumulator >= dt:
+                self._update_game(dt)
+                accumulator -= dt
 
             # Access images method
             self._update_screen()
+            # input read this frame is on screen now
+            self.profiler.latency.presented(self.input_time)
+            self.input_time = None
+            # store timings of this frame
+            self.profiler.end_frame()
+
+    def _check_leaderboard(self):
+        """Show saved high score once leaderboard has loaded it"""
+        # games made with leaderboard=False have nothing to show
+        if self.leaderboard is None:
+            return
+        best = self.leaderboard.poll_best()
+        if best is not None and best > self.stats.high_score:
+            self.stats.high_score = best
+            self.sb.prep_high_score()
+
+    def _update_game(self, dt):
+        """Advance the game simulation by one fixed tick of dt seconds"""
+        self.tick_count += 1
+        # explosions keep playing during pauses
+        self.explosions.update(dt)
+        # during a pause only the pause timer runs, screen is still drawn
+        if self.state != PLAYING:
+            self._update_state(dt)
+        # if game is active mainloop should run
+        elif self.stats.game_active:
+            # Position of ship is updated after event is checked before screen is updated
+            start = perf_counter()
+            self.ship.update(dt)
+            start = self.profiler.lap(profiler.SHIP, start)
+            # update bullet position
+            self._update_bullets(dt)
+            start = perf_counter()
+            # update alien position
+            self._update_aliens(dt)
+            self.profiler.lap(profiler.ALIENS, start)
+
+    def _enter_state(self, state, duration):
+        """Start a timed game state that lasts duration seconds"""
+        self.state = state
+        self.state_timer = duration
+        # state with no time left or skipped pauses end at once, in the same tick
+        if duration <= 0 or self.settings.skip_pauses:
+            self._end_state()
+
+    def _update_state(self, dt):
+        """Count down timer of current game state and end state when time is up"""
+        self.state_timer -= dt
+        if self.state_timer <= 0:
+            self._end_state()
+
+    def _end_state(self):
+        """Finish what the current game state was waiting for and resume playing"""
+        if self.state == SHIP_HIT:
+            # create a new fleet after regrouping
+            self._create_fleet()
+        elif self.state == LEVEL_UP:
+            # increase game for next fleet
+            self.settings.increase_speed()
+
+            # increase level count if fleet is destroyed
+            self.stats.level += 1
+            # update level count
+            self.sb.prep_level()
+            # create a new fleet, wave formation depends on level
+            self._create_fleet()
+        self.state = PLAYING
+        self.state_timer = 0.0
+
+    def step(self, actions=(), ticks=1):
+        """Advance the game by ticks fixed ticks as fast as possible
+
+        actions is a collection of action names used instead of keyboard and mouse:
+        "play" starts a new game, "left" and "right" move the ship, "fire" fires a bullet
+        Returns True while the game is still active
+        """
+        # length of one simulation tick in seconds
+        dt = 1 / self.settings.tick_rate
+        # same as pressing play button
+        if "play" in actions and not self.stats.game_active:
+            self._start_game()
+        # ship moves while action is held, same as holding arrow keys
+        self.ship.moving_left = "left" in actions
+        self.ship.moving_right = "right" in actions
+        # same as pressing spacebar once
+        if "fire" in actions and self.stats.game_active:
+            self._fire_bullets()
+        # run simulation without drawing anything
+        for _ in range(ticks):
+            self._update_game(dt)
+        return self.stats.game_active
 
     # Respond to events
     def _check_events(self):
@@ -71,14 +287,20 @@ class AlienInvasion:
 
         # pygame.event.get() returns list of events (mouse, keyboard) taken place since function was called
         for event in pygame.event.get():
+            # input latency is measured from the first input read since last frame
+            if self.input_time is None and event.type in INPUT_EVENTS:
+                self.input_time = perf_counter()
             if event.type == pygame.QUIT:  # Detect and respond to different events
-                sys.exit()  # When user exits game pygame.QUIT is detected and sys.exit() is called
+                self._quit()  # When user exits game pygame.QUIT is detected and game quits
             # If pygame detects an action of key pressed down
             elif event.type == pygame.KEYDOWN:
                 self._check_keydown_events(event)
             # If key press is released
             elif event.type == pygame.KEYUP:
                 self._check_keyup_events(event)
+            # If window was hidden and shown again whole screen has to be redrawn
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.renderer.full_redraw = True
             # If mouse is pressed
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 # return a tuple of mouse (x,y) coordinates
@@ -89,98 +311,121 @@ class AlienInvasion:
     def _fire_bullets(self):
         """Create a new bullet and add it to bullets group"""
         # If amount of bullets fired (spacebar pressed) is less then what is allowed
-        if len(self.bullets) < self.settings.bullets_allowed:
-            # Instance of new bullet is created
-            new_bullet = Bullet(self)
-            # Bullet is added to group
-            self.bullets.add(new_bullet)
+        # no bullets are fired while game is paused
+        if self.state == PLAYING and len(self.bullets) < self.settings.bullets_allowed:
+            # Free bullet from pool is placed at top of ship
+            self.bullets.fire(self.ship.rect.midtop)
 
     def _create_fleet(self):
         """"Create fleet of aliens"""
-        # create alien fleet and find number of aliens in a row
-        # alien is created
-        alien = Alien(self)
-        # get alien width and height
-        alien_width, alien_height = alien.rect.size
-        # calculate horizontal space for aliens to distance each other
-        # amount of aliens drawn must appear on screen width
-        space_x = self.settings.screen_width - (2 * alien_width)
-        # calculate how many aliens to fit in row
-        num_alien_x = space_x // (2 * alien_width)
-
-        # determine number of rows of aliens that fit on screen
-        ship_height = self.ship.rect.height
-        # determine number of rows to fit on screen
-        space_y = (self.settings.screen_height -
-                   (3 * alien_height) - ship_height)
-        num_row = space_y // (2 * alien_height)
-        # create full fleet of aliens
-        # count from 0 to amount of rows needed
-        # create fleet of aliens in specified amount of rows
-        for row_num in range(num_row):
-            # create first alien row
-            # create for loop from 0 to amount of aliens needed to fill row
-            for alien_num in range(num_alien_x):
-                # create alien in 1 row
-                self._create_alien(alien_num, row_num)
+        # fleet places pooled aliens from layout
+        self.aliens.spawn(self._fleet_layout())
+
+    def _fleet_layout(self):
+        """Return layout of the wave for the current level"""
+        # wave formations take turns, one per level
+        waves = self.settings.waves
+        wave = waves[(self.stats.level - 1) % len(waves)]
+        # position of every alien is computed once per screen size and wave, then reused
+        alien_size = self.assets.get_image("Images/alien.bmp").get_size()
+        layout = fleet_layout(self.settings, alien_size, self.ship.rect.height, wave)
+        # remember size of fleet layout, aliens are numbered row by row
+        self.fleet_size = (layout.num_alien_x, layout.num_row)
+        return layout
 
     # Update images to screen and flip to new screen
     def _update_screen(self):
         # Redraw the screen during each pass through the loop with background color
-        # fill() method is found on in a surface and fills screen with color
-        self.screen.fill(self.settings.bg_color)
+        # in dirty render mode only areas drawn last frame are cleared
+        start = perf_counter()
+        self.renderer.begin_frame()
+        start = self.profiler.lap(profiler.FILL, start)
+        # everything is added to the render queue first and drawn in a few calls at the end
+        queue = self.renderer.queue
+        self._enqueue_frame(queue)
+        start = perf_counter()
+        # draw queued images layer by layer, every draw returns area of screen it changed
+        rects = queue.flush(self.screen)
+        start = self.profiler.lap(profiler.DRAW, start)
+
+        # Make most recent drawn screen visible
+        # full render mode flips whole screen, dirty render mode only updates changed areas
+        self.renderer.end_frame(rects)
+        self.profiler.lap(profiler.FLIP, start)
+
+    def _enqueue_frame(self, queue):
+        """Add everything shown on screen to render queue"""
+        start = perf_counter()
         # Draw ship onto screen
-        self.ship.blitme()
-        # bullets.sprites() method returns a list of all sprites in the group bullet
-        for bullet in self.bullets.sprites():
-            # To draw each bullet the sprites are iterated and draw_bullet() is called on each bullet
-            bullet.draw_bullet()
+        self.ship.enqueue(queue)
+        # draw every bullet
+        self.bullets.enqueue(queue)
         # draw alien onto screen
-        self.aliens.draw(self.screen)
+        self.aliens.enqueue(queue)
+        # draw exploding aliens
+        self.explosions.enqueue(queue)
+        start = self.profiler.lap(profiler.SPRITES, start)
         # draw score information
-        self.sb.show_score()
+        self.sb.enqueue(queue)
+        # draw frame timings next to scoreboard if overlay is shown
+        self.profiler.enqueue_overlay(queue)
         # draw play button is game is inactive
         if not self.stats.game_active:
-            # draw button onto screen on top of all elements
-            self.play_button.draw_button()
-
-        # Make most recent drawn screen visible
-        # Draws empty screen at each iteration of the while loop, old screen overwritten with new screen
-        pygame.display.flip()
+            # button is on the top layer so it is drawn over all elements
+            self.play_button.enqueue(queue)
+        self.profiler.lap(profiler.SCORE, start)
 
-    def _update_bullets(self):
+    def _update_bullets(self, dt):
         """Update position of bullets and get rid of old ones"""
-        # Update bullet position, calls bullet.update() for each bullet in the group
-        self.bullets.update()
-        # Get rid of bullets that disappeared
-        # Get copy of bullets group in order not to affect group in other parts of code
-        for bullet in self.bullets.copy():
-            # If bullet position bottom is of the top screen
-            if bullet.rect.bottom <= 0:
-                # Bullet is removed
-                self.bullets.remove(bullet)
+        # Update bullet position and get rid of bullets that disappeared
+        # bullets off the top of screen go back to the pool without copying the pool
+        start = perf_counter()
+        distance = self.bullets.move(dt)
+        start = self.profiler.lap(profiler.BULLETS, start)
 
         # check for bullet collision with alien
-        self._check_bullet_alien_collisions()
-
-    def _update_aliens(self):
-        """Check if fleet is at edge then update position of all aliens in fleet"""
-        self._check_fleet_edges()
+        # bullets are swept back down the distance they moved so fast bullets can not skip aliens
+        self._check_bullet_alien_collisions(dy=distance)
+        # bullets that left the screen are removed after they had their chance to hit
+        self.bullets.remove_offscreen()
+        self.profiler.lap(profiler.COLLISIONS, start)
+
+    def _update_aliens(self, dt):
+        """Move fleet, turning at screen edges, then check for aliens hitting ship or bottom"""
+        self.aliens.animate(dt)
         # check if aliens position is updated
-        self.aliens.update()
+        low, high, offset, dropped = self._move_fleet(dt)
 
         # if there is an alien-ship collision
-        # spritecollideany() find if any member of group aliens collides with ship
-        # loops through group aliens and return first alien collided with ship
-        if pygame.sprite.spritecollideany(self.ship, self.aliens):
+        # ship area covers everywhere ship was relative to aliens during the tick
+        # collide_rect() skips checking aliens when fleet bounding box is away from ship
+        if self.aliens.collide_rect(self._swept_ship_rect(low, high, offset, dropped)):
             # ship responds to hit
             self._ship_hit()
         # find aliens hitting bottom of screen
         self._check_aliens_bottom()
         # new fleet appears every time ship is hit by alien or alien reaches bottom of screen
 
+    def _quit(self):
+        """Save recording if session is recorded and exit game"""
+        if self.recorder is not None:
+            self.recorder.save(self)
+        # wait for scores still being written
+        if self.leaderboard is not None:
+            self.leaderboard.close()
+        if self.report_latency:
+            print(self.profiler.latency.report())
+        # write frames still queued and stop capture writer
+        if self.renderer.capture is not None:
+            self.renderer.capture.close()
+            print(self.renderer.capture.report())
+        sys.exit()
+
     def _check_keydown_events(self, event):
         """Respond to key press"""
+        # input is recorded against the next tick to run so replay applies it at the same point
+        if self.recorder is not None:
+            self.recorder.record(self.tick_count, event.type, event.key)
         if event.key == pygame.K_RIGHT:
             # Move ship to the right
             self.ship.moving_right = True
@@ -193,9 +438,18 @@ class AlienInvasion:
             self._fire_bullets()
         # If user press q key game quits
         elif event.key == pygame.K_q:
-            sys.exit()
+            self._quit()
+        # F3 shows or hides frame timings
+        elif event.key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+        # F4 saves frame timings to CSV file
+        elif event.key == pygame.K_F4:
+            self.profiler.dump_csv(self.settings.profile_path)
 
     def _check_keyup_events(self, event):
+        """Respond to key release"""
+        if self.recorder is not None:
+            self.recorder.record(self.tick_count, event.type, event.key)
         if event.key == pygame.K_RIGHT:
             # Ship won't move rightwards
             self.ship.moving_right = False
@@ -218,67 +472,104 @@ class AlienInvasion:
             self.aliens.empty()
             self.bullets.empty()
 
-            # create a new fleet and center ship
-            self._create_fleet()
             # coordinate response when enemy hits ship
             self.ship.center_ship()
+            # pause game briefly for regrouping, new fleet is created when pause ends
+            # game keeps handling events and drawing during the pause
+            self._enter_state(SHIP_HIT, self.settings.ship_hit_pause)
         # if there is no ships game stops
         else:
             self.stats.game_active = False
+            # save finished game, written on leaderboard thread so frame does not wait
+            if self.leaderboard is not None:
+                self.leaderboard.record(self.stats.score, self.stats.level)
             # show cursor
-            pygame.mouse.set_visible(True)
-
-        # pause game briefly for regrouping
-        sleep(0.5)
-
-    def _create_alien(self, alien_num, row_num):
-        # create alien
-        alien = Alien(self)
-        # get alien width and height
-        alien_width, alien_height = alien.rect.size
-        # place alien in row
-        # for every alien created each alien is move 1 alien width right
-        alien.x = alien_width + 2 * alien_width * alien_num
-        # set alien rect position
-        alien.rect.x = alien.x
-        # create space for aliens below row
-        alien.rect.y = alien.rect.height + 2 * alien.rect.height * row_num
-        # Add alien to group fleet
-        self.aliens.add(alien)
-
-    def _check_fleet_edges(self):
-        """Respond if any alien hits the edges"""
-        # access aliens group list
-        for alien in self.aliens.sprites():
-            # check edges on whole fleet of aliens
-            if alien.check_edges():
-                # if alien is at edge, whole fleet needs to change directions
-                self._check_fleet_direction()
-                # loop stops when fleet need to change directions
+            if not self.headless:
+                pygame.mouse.set_visible(True)
+
+    def _move_fleet(self, dt):
+        """Move fleet by distance travelled in dt seconds, turning exactly where it meets an edge
+
+        Returns lowest and highest point of fleet x position during the tick
+        relative to where it started, how far it moved in the end and how far
+        it dropped, used to sweep ship against the fleet
+        """
+        remaining = self.settings.alien_speed * dt
+        offset = low = high = 0.0
+        dropped = 0
+        # empty fleet has no edges to turn at
+        if not len(self.aliens):
+            return low, high, offset, dropped
+        turned = False
+        while True:
+            direction = self.settings.fleet_direction
+            # fleet only checks aliens at the edges of its bounding box
+            room = max(self.aliens.edge_room(direction), 0)
+            step = min(remaining, room)
+            if step:
+                self._shift_fleet(step * direction)
+                offset += step * direction
+                low = min(low, offset)
+                high = max(high, offset)
+                remaining -= step
+                turned = False
+            # fleet stops short of edge, tick is over
+            # fleet wider than screen would turn forever, it stays where it is
+            if remaining < room or turned:
+                break
+            # if alien is at edge, whole fleet needs to change directions
+            # rest of the distance is travelled in the new direction
+            self._check_fleet_direction()
+            dropped += self.settings.fleet_drop_speed
+            turned = True
+            if not remaining:
                 break
+        return low, high, offset, dropped
+
+    def _shift_fleet(self, distance):
+        """Move fleet sideways by distance pixels, checking bullets it passes over"""
+        self.aliens.move(distance)
+        # a step wider than an alien could carry it across a bullet without touching it
+        # bullets are swept back sideways the way the fleet moved past them
+        if abs(distance) > self.atlas.width and self.bullets:
+            self._check_bullet_alien_collisions(dx=distance)
+
+    def _swept_ship_rect(self, low, high, offset, dropped):
+        """Return area ship covered relative to the fleet during the tick, in end of tick positions"""
+        ship = self.ship
+        # ship moved from last_left to x while fleet moved between low and high
+        # seen from the fleet, ship moved the other way
+        start = min(ship.last_left, ship.x) + offset
+        end = max(ship.last_left, ship.x) + offset
+        left = floor(start - high)
+        right = ceil(end - low) + ship.rect.width
+        # fleet was higher before it dropped, seen from the fleet ship was lower
+        return pygame.Rect(left, ship.rect.y, right - left, ship.rect.height + dropped)
 
     def _check_fleet_direction(self):
         """Drop entire fleet and change directions"""
-        for alien in self.aliens.sprites():
-            # loop through each alien and drop each alien according to drop speed
-            alien.rect.y += self.settings.fleet_drop_speed
+        # drop each alien according to drop speed
+        self.aliens.drop(self.settings.fleet_drop_speed)
         # change direction of fleet once by multiplying -1 every time fleet has to change directions
         self.settings.fleet_direction *= -1
 
-    def _check_bullet_alien_collisions(self):
+    def _check_bullet_alien_collisions(self, dx=0, dy=0):
         """Respond to bullet-alien collisions"""
         # check for any bullets hitting aliens (collision)
         # get rid of bullet and alien after collision
         # groupcollide() compare positions of all bullets and all aliens for any overlap positions/collisions
         # A dictionary is returned containing the bullet and list of aliens hit by bullet as key/value pair
         # groupcollide(,,True, True) tells pygame to delete bullet and alien if collided
-        collisions = pygame.sprite.groupcollide(self.bullets, self.aliens, True, True)  # collisions of bullet-alien
+        # bullets are swept by (dx, dy) back to where they were relative to the aliens
+        collisions = self.aliens.collide_bullets(self.bullets, dx, dy)  # collisions of bullet-alien
         # if bullet hits an alien
         if collisions:
             # iterate through list of collided aliens
             for aliens in collisions.values():
-                # increase score for every alien hit
-                self.stats.score += self.settings.alien_points * len(aliens)
+                # increase score for every alien hit, some alien kinds are worth more
+                self.stats.score += self.settings.alien_points * self.aliens.points(aliens)
+                # aliens that were hit explode where they were
+                self.aliens.explode(aliens, self.explosions)
             # update score
             self.sb.prep_score()
             # update high score after aliens is hit by bullets
@@ -288,59 +579,91 @@ class AlienInvasion:
             # Destroy existing bullets and create new fleet
             # Delete existing bullets, empty() deletes all elements
             self.bullets.empty()
-            # create a new fleet
-            self._create_fleet()
-            # increase game for next fleet
-            self.settings.increase_speed()
-
-            # increase level count if fleet is destroyed
-            self.stats.level += 1
-            # update level count
-            self.sb.prep_level()
+            # new fleet, faster settings and level count come when level transition ends
+            self._enter_state(LEVEL_UP, self.settings.level_pause)
 
     def _check_aliens_bottom(self):
         """Check if aliens reached the bottom"""
         screen_rect = self.screen.get_rect()
-        for alien in self.aliens.sprites():
-            # if one alien hits the bottom of the screen then ship is hit
-            # no need to check if all aliens hit the bottom
-            if alien.rect.bottom >= screen_rect.bottom:
-                # display same response as alien hitting ship
-                self._ship_hit()
-                break
+        # if lowest alien hits the bottom of the screen then ship is hit
+        # no need to check every alien, fleet knows its lowest alien
+        if self.aliens.reached_bottom(screen_rect.bottom):
+            # display same response as alien hitting ship
+            self._ship_hit()
 
     def _check_play_button(self, mouse_pos):
         """Start new game when player presses play button"""
+        if self.recorder is not None:
+            self.recorder.record(self.tick_count, pygame.MOUSEBUTTONDOWN, *mouse_pos)
         # collidepoint() check whether point of mouse click overlaps region defined by button rect
         button_clicked = self.play_button.rect.collidepoint(mouse_pos)
         # if button is clicked and game active is false (not active)
         if button_clicked and not self.stats.game_active:
-            # reset game settings
-            self.settings.initialize_dynamic_settings()
-            # reset game stats
-            self.stats.reset_stats()
-            # if play button press game is active
-            self.stats.game_active = True
-            # reset score to 0 with every new game
-            self.sb.prep_score()
-            # level image updates
-            self.sb.prep_level()
-            # how many ships player started with
-            self.sb.prep_ships()
-
-            # get rid of remaining aliens and bullets
-            self.aliens.empty()
-            self.bullets.empty()
-
-            # create new fleet and center ship
-            self._create_fleet()
-            self.ship.center_ship()
+            self._start_game()
+
+    def _start_game(self):
+        """Reset settings, stats and fleet and start a new game"""
+        # reset game settings
+        self.settings.initialize_dynamic_settings()
+        # reset game stats
+        self.stats.reset_stats()
+        # new game never starts paused
+        self.state = PLAYING
+        self.state_timer = 0.0
+        # if play button press game is active
+        self.stats.game_active = True
+        # reset score to 0 with every new game
+        self.sb.prep_score()
+        # level image updates
+        self.sb.prep_level()
+        # how many ships player started with
+        self.sb.prep_ships()
+
+        # get rid of remaining aliens and bullets
+        self.aliens.empty()
+        self.bullets.empty()
+        self.explosions.empty()
+
+        # create new fleet and center ship
+        self._create_fleet()
+        self.ship.center_ship()
 
-            # hide mouse cursor
+        # hide mouse cursor
+        if not self.headless:
             pygame.mouse.set_visible(False)
 
 
 if __name__ == "__main__":  # If file is called directly
+    import argparse  # Tools used to read command line options
+    from replay import Recorder  # use replay module
+
+    parser = argparse.ArgumentParser(description="Play Alien Invasion")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record session input to PATH for replay.py")
+    parser.add_argument("--seed", type=int, help="seed for random numbers")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print time spent on every startup step")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run simulation and drawing on separate threads")
+    parser.add_argument("--frame-buffers", type=int, choices=(2, 3), default=3,
+                        help="frames passed between threads in pipeline mode")
+    parser.add_argument("--latency-report", action="store_true",
+                        help="print input latency and tick rate when game quits")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="save every presented frame to PATH, frames are dropped if disk is slow")
+    parser.add_argument("--capture-format", choices=("png", "raw", "ffmpeg"), default="png",
+                        help="PNG images in folder PATH, raw rgb24 file or video made by ffmpeg")
+    args = parser.parse_args()
+    settings = Settings()
+    settings.pipeline = args.pipeline
+    settings.frame_buffers = args.frame_buffers
     # Make a game instance and run game
-    ai = AlienInvasion()
+    ai = AlienInvasion(settings=settings, seed=args.seed,
+                       recorder=Recorder(args.record) if args.record else None)
+    ai.report_latency = args.latency_report
+    if args.capture:
+        from capture import FrameCapture  # use capture module
+        ai.renderer.capture = FrameCapture(ai, args.capture, args.capture_format)
+    if args.startup_report:
+        print(ai.startup_report())
     ai.Run_Game()
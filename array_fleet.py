@@ -0,0 +1,356 @@
+from itertools import compress  # Tools used to pick images of aliens alive
+from math import floor  # Tools used to round alien x like rect.x
+import numpy as np
+from renderer import SPRITES  # use renderer module
+from atlas import WALK_FRAMES  # use atlas module
+from collision import swept_bounds  # use collision module
+from waves import ALIEN_KINDS  # use waves module
+
+# above this many bullets collide_bullets() tests all pairs with arrays instead of grid cells
+MANY_BULLETS = 32
+
+
+class ArrayFleet:
+    """Class to manage the whole alien fleet with NumPy arrays
+
+    Alien positions and alive flags are stored in arrays (struct of arrays)
+    so moving and dropping are a few vectorized operations instead of a Python
+    loop over every alien sprite. Like Fleet, the fleet remembers its edge
+    aliens, only found again after an edge alien is removed, and keeps a grid
+    of layout cells so bullets are only tested against aliens in nearby cells.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize empty fleet"""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        # every alien kind has one image from the asset cache
+        self.image = ai_game.assets.get_image("Images/alien.bmp")
+        self.width, self.height = self.image.get_size()
+        # size of one grid cell, aliens are 1 alien width/height apart
+        self.cell_width = 2 * self.width
+        self.cell_height = 2 * self.height
+        # animation frames of every alien kind
+        self.atlas = ai_game.atlas
+        # seconds fleet has moved, picks walk frame of every alien at once
+        self.anim_time = 0.0
+        # pixels whole fleet moved right and down since it was spawned
+        self.shift_x = 0.0
+        self.shift_y = 0
+        # number of fleets spawned so far
+        self.spawns = 0
+        # arrays of every layout spawned so far, layout is the key
+        self.templates = {}
+
+        # exact x position, y position and alive flag of every alien
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.alive = np.zeros(0, dtype=bool)
+        # points multiplier, slot of layout grid (row * columns + column) and atlas row of kind
+        self.points_of = np.zeros(0, dtype=int)
+        self.slots = np.zeros(0, dtype=int)
+        self.kinds = np.zeros(0, dtype=int)
+        # image of every alien for each walk frame
+        self.images = [[] for _ in range(WALK_FRAMES)]
+        # column and row of every alien and index of alien in every [row][column] cell, -1 if empty
+        self.cols = np.zeros(0, dtype=int)
+        self.rows = np.zeros(0, dtype=int)
+        self.grid_cells = [[]]
+        # number of aliens still alive
+        self.count = 0
+        # indexes of aliens at the edges of the fleet bounding box, None when fleet is empty
+        self.leftmost = None
+        self.rightmost = None
+        self.lowest = None
+        self._bounds_dirty = False
+
+    def __len__(self):
+        """Return number of aliens alive"""
+        return self.count
+
+    def __bool__(self):
+        """Return True while any alien is alive"""
+        return self.count > 0
+
+    def _template(self, layout):
+        """Return arrays of layout, build them the first time layout is spawned"""
+        template = self.templates.get(layout)
+        if template is None:
+            slots = layout.slots
+            kinds = [self.atlas.row(kind) for *_, kind in slots]
+            template = (
+                np.array([x for _, _, x, _, _ in slots], dtype=float),
+                np.array([y for _, _, _, y, _ in slots], dtype=float),
+                np.array([ALIEN_KINDS[kind]["points"] for *_, kind in slots], dtype=int),
+                np.array([row * layout.num_alien_x + col for col, row, *_ in slots], dtype=int),
+                np.array(kinds, dtype=int),
+                [[self.atlas.walk[kind][frame] for kind in kinds] for frame in range(WALK_FRAMES)],
+                np.array([col for col, *_ in slots], dtype=int),
+                np.array([row for _, row, *_ in slots], dtype=int),
+            )
+            grid = np.full((layout.num_row, layout.num_alien_x), -1, dtype=int)
+            grid[template[7], template[6]] = np.arange(len(slots))
+            # grid is read one cell at a time, nested lists are faster for that than an array
+            template += (grid.tolist(),)
+            self.templates[layout] = template
+        return template
+
+    def spawn(self, layout):
+        """Replace fleet with aliens placed from layout (waves.FleetLayout)"""
+        x, y, points, slots, kinds, images, cols, rows, grid_cells = self._template(layout)
+        if len(self.x) == len(x):
+            # same size as last wave so arrays are refilled in place
+            self.x[:] = x
+            self.y[:] = y
+            self.alive[:] = True
+        else:
+            self.x = x.copy()
+            self.y = y.copy()
+            self.alive = np.ones(len(x), dtype=bool)
+        # these never change during a wave so template arrays are shared
+        self.points_of = points
+        self.slots = slots
+        self.kinds = kinds
+        self.images = images
+        self.cols = cols
+        self.rows = rows
+        self.grid_cells = grid_cells
+        self.count = len(x)
+        self._bounds_dirty = True
+        self.shift_x = 0.0
+        self.shift_y = 0
+        self.spawns += 1
+
+    def alive_slots(self):
+        """Return set of layout slots of aliens alive"""
+        return set(np.flatnonzero(self.alive).tolist())
+
+    def remove_slots(self, slots, explosions=None):
+        """Remove aliens at layout slots, they explode if explosions is given"""
+        hit = [slot for slot in slots if self.alive[slot]]
+        if explosions is not None:
+            self.explode(hit, explosions)
+        self._remove(hit)
+
+    def _remove(self, hit):
+        """Mark aliens at indexes in hit dead, bounding box is only rebuilt if one was at an edge"""
+        self.alive[hit] = False
+        self.count -= len(hit)
+        if any(i in (self.leftmost, self.rightmost, self.lowest) for i in hit):
+            self._bounds_dirty = True
+
+    def _update_bounds(self):
+        """Find edge aliens again after an edge alien was removed"""
+        alive = np.flatnonzero(self.alive)
+        if len(alive):
+            # fleet moves as one body, so edge aliens stay at the edges until removed
+            self.leftmost = int(alive[np.argmin(self.x[alive])])
+            self.rightmost = int(alive[np.argmax(self.x[alive])])
+            self.lowest = int(alive[np.argmax(self.y[alive])])
+        else:
+            self.leftmost = self.rightmost = self.lowest = None
+        self._bounds_dirty = False
+
+    def pack_state(self):
+        """Return layout slot, x and y of every alien alive packed into bytes, used by snapshots
+
+        Slots are int32 values followed by x and y as float64 values, same
+        layout as Fleet.pack_state() so snapshots work with both backends
+        """
+        alive = np.flatnonzero(self.alive)
+        return (alive.astype(np.int32).tobytes() + self.x[alive].tobytes()
+                + self.y[alive].tobytes())
+
+    def unpack_state(self, layout, data):
+        """Replace fleet with aliens of layout packed by pack_state()"""
+        count = len(data) // 20
+        slots = np.frombuffer(data, dtype=np.int32, count=count)
+        # spawn refills the arrays, then only packed aliens are kept alive
+        self.spawn(layout)
+        self.alive[:] = False
+        self.alive[slots] = True
+        self.x[slots] = np.frombuffer(data, dtype=float, count=count, offset=4 * count)
+        self.y[slots] = np.frombuffer(data, dtype=float, count=count, offset=12 * count)
+        self.count = count
+        self._bounds_dirty = True
+        # every alien moved the same way, so any alien tells how far the fleet moved
+        if count:
+            x, y, *_ = self._template(layout)
+            self.shift_x = float(self.x[slots[0]] - x[slots[0]])
+            self.shift_y = int(self.y[slots[0]] - y[slots[0]])
+
+    def points(self, hit):
+        """Return points multiplier of aliens in hit, a list from collide_bullets"""
+        return int(self.points_of[hit].sum())
+
+    def explode(self, hit, explosions):
+        """Start explosions where aliens in hit were, a list from collide_bullets"""
+        for i in hit:
+            explosions.add(int(np.floor(self.x[i] + 0.5)), int(self.y[i]), int(self.kinds[i]))
+
+    def empty(self):
+        """Remove every alien"""
+        self.alive[:] = False
+        self.count = 0
+        self.leftmost = self.rightmost = self.lowest = None
+        self._bounds_dirty = False
+
+    def _rect_x(self):
+        """Return whole pixel x positions, same as setting rect.x from alien.x"""
+        return np.floor(self.x + 0.5)
+
+    def animate(self, dt):
+        """Advance fleet animation by dt seconds"""
+        self.anim_time += dt
+
+    def edge_room(self, direction):
+        """Return pixels fleet can move in direction (1 right, -1 left) before it touches an edge"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        if self.leftmost is None:
+            return 0.0
+        if direction > 0:
+            return float(self.settings.screen_width - (self.x[self.rightmost] + self.width))
+        return float(self.x[self.leftmost])
+
+    def move(self, distance):
+        """Move whole fleet distance pixels to the right, negative moves left"""
+        self.shift_x += distance
+        self.x += distance
+
+    def drop(self, amount):
+        """Move whole fleet down by amount pixels"""
+        self.shift_y += amount
+        self.y += amount
+
+    def reached_bottom(self, bottom):
+        """Return True if any alien reached bottom y coordinate"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        if self.lowest is None:
+            return False
+        return self.y[self.lowest] + self.height >= bottom
+
+    def _overlaps(self, left, top, right, bottom):
+        """Return array of flags for aliens alive and overlapping the rect edges"""
+        # left, top, right and bottom can be arrays of shape (n, 1) to test n rects at once
+        x = self._rect_x()
+        return (self.alive
+                & (x < right) & (x + self.width > left)
+                & (self.y < bottom) & (self.y + self.height > top))
+
+    def collide_rect(self, rect):
+        """Return True if any alien overlaps rect"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        # nothing can overlap rect if whole fleet is above or beside it
+        if (self.lowest is None or self.y[self.lowest] + self.height <= rect.top
+                or floor(self.x[self.leftmost] + 0.5) >= rect.right
+                or floor(self.x[self.rightmost] + 0.5) + self.width <= rect.left):
+            return False
+        return bool(self._overlaps(rect.left, rect.top,
+                                   rect.right, rect.bottom).any())
+
+    def collide_bullets(self, bullets, dx=0, dy=0):
+        """Remove bullets and aliens that collide
+
+        Every bullet is swept by (dx, dy), the way back to where it was at the
+        start of the tick relative to the aliens, and only destroys the aliens
+        it touched first, same as Fleet.collide_bullets()
+
+        Returns dictionary of bullet and list of alien indexes hit by that bullet
+        """
+        collisions = {}
+        if not self.count or not bullets:
+            return collisions
+        # with many bullets one array test of every bullet against every alien is faster
+        if len(bullets) > MANY_BULLETS:
+            return self._collide_all(bullets, dx, dy)
+        if self._bounds_dirty:
+            self._update_bounds()
+        grid = self.grid_cells
+        x = self.x
+        y = self.y
+        alive = self.alive
+        width = self.width
+        height = self.height
+        # fleet moved as one body since it was spawned, so grid moved by the same offset
+        # offset is found from any alien, here the leftmost one
+        anchor = self.leftmost
+        origin_x = floor(x[anchor] + 0.5) - width - int(self.cols[anchor]) * self.cell_width
+        origin_y = int(y[anchor]) - height - int(self.rows[anchor]) * self.cell_height
+        # same order as Fleet, an alien hit by an earlier bullet is already gone
+        # few bullets are tested against few cells, plain Python is faster than array calls here
+        for bullet in bullets:
+            left, top, right, bottom = swept_bounds(bullet.rect, dx, dy)
+            # columns and rows of cells swept area can overlap
+            first_col = max((left - origin_x - 2 * width) // self.cell_width, 0)
+            last_col = min((right - origin_x - width) // self.cell_width, len(grid[0]) - 1)
+            first_row = max((top - origin_y - 2 * height) // self.cell_height, 0)
+            last_row = min((bottom - origin_y - height) // self.cell_height, len(grid) - 1)
+            hit = []
+            for row in range(first_row, last_row + 1):
+                cells = grid[row]
+                for col in range(first_col, last_col + 1):
+                    i = cells[col]
+                    if i >= 0 and alive[i]:
+                        alien_x = floor(x[i] + 0.5)
+                        alien_y = y[i]
+                        if (alien_x < right and alien_x + width > left
+                                and alien_y < bottom and alien_y + height > top):
+                            hit.append(i)
+            if hit:
+                hit = np.array(sorted(hit))
+                if len(hit) > 1:
+                    hit = hit[self._first_hits(bullet.rect, hit, dx, dy)]
+                hit = hit.tolist()
+                self._remove(hit)
+                collisions[bullet] = hit
+        # delete bullets that collided
+        for bullet in collisions:
+            bullets.remove(bullet)
+        return collisions
+
+    def _collide_all(self, bullets, dx, dy):
+        """Test every swept bullet against every alien in one array operation"""
+        collisions = {}
+        bullet_list = bullets.active
+        edges = np.array([swept_bounds(b.rect, dx, dy) for b in bullet_list], dtype=float)
+        hits = self._overlaps(edges[:, 0:1], edges[:, 1:2],
+                              edges[:, 2:3], edges[:, 3:4])
+        # only loop over bullets that hit something, in group order
+        # an alien hit by an earlier bullet can not be hit again
+        for i in np.flatnonzero(hits.any(axis=1)):
+            hit = np.flatnonzero(hits[i] & self.alive)
+            if len(hit) > 1:
+                hit = hit[self._first_hits(bullet_list[i].rect, hit, dx, dy)]
+            if len(hit):
+                hit = hit.tolist()
+                self._remove(hit)
+                collisions[bullet_list[i]] = hit
+        for bullet in collisions:
+            bullets.remove(bullet)
+        return collisions
+
+    def _first_hits(self, rect, hit, dx, dy):
+        """Return flags of aliens in hit the bullet rect touched first, like collision.first_hits()"""
+        reach = np.ones(len(hit))
+        x = self._rect_x()[hit]
+        y = self.y[hit]
+        if dx > 0:
+            reach = np.minimum(reach, (x + self.width - rect.left) / dx)
+        elif dx < 0:
+            reach = np.minimum(reach, (x - rect.right) / dx)
+        if dy > 0:
+            reach = np.minimum(reach, (y + self.height - rect.top) / dy)
+        elif dy < 0:
+            reach = np.minimum(reach, (y - rect.bottom) / dy)
+        return reach == reach.max()
+
+    def enqueue(self, queue):
+        """Add current walk frame of every alien alive to render queue"""
+        alive = self.alive
+        frame = int(self.anim_time / self.settings.alien_frame_time) % WALK_FRAMES
+        images = compress(self.images[frame], alive.tolist())
+        queue.extend(SPRITES, zip(images, zip(self._rect_x()[alive].tolist(),
+                                              self.y[alive].tolist())))
@@ -0,0 +1,100 @@
+import threading  # Tools used to read images while game starts
+import pygame
+
+
+class Assets:
+    """A class to load game images and fonts once and share them"""
+
+    def __init__(self):
+        """Initialize empty image cache"""
+        # loaded images, file path is the key and converted surface is the value
+        self.images = {}
+        # images read by background thread that are not converted yet
+        self.loaded = {}
+        self.loader = None
+        # fonts, size is the key
+        self.fonts = {}
+        # glyph caches made by text.glyph_cache(), font and colors are the key
+        self.glyph_caches = {}
+        # count how many times an image is read from disk
+        # stays the same after startup once every image is cached
+        self.disk_reads = 0
+
+    def get_image(self, path, alpha=False):
+        """Return shared surface for image at path, load it on first use"""
+        # image already loaded so hand out the same surface
+        image = self.images.get(path)
+        if image is None:
+            # wait for background thread, it may be reading this image already
+            if self.loader is not None:
+                self.loader.join()
+                self.loader = None
+            # read image from disk only the first time it is asked for
+            image = self.loaded.pop(path, None)
+            if image is None:
+                image = pygame.image.load(path)
+            self.disk_reads += 1
+            # convert image to display pixel format so blits are fast
+            # convert_alpha() keeps transparency for images that have it
+            if alpha:
+                image = image.convert_alpha()
+            else:
+                image = image.convert()
+            # store image so next request does not touch the disk
+            self.images[path] = image
+        return image
+
+    def get_recolored(self, path, channels):
+        """Return shared copy of image at path with color channels reordered
+
+        channels gives the old channel used for new red, green and blue,
+        (1, 0, 2) swaps red and green. Gray pixels keep their color.
+        """
+        # original order needs no copy
+        if channels == (0, 1, 2):
+            return self.get_image(path)
+        key = (path, channels)
+        image = self.images.get(key)
+        if image is None:
+            original = self.get_image(path)
+            # pixels as red, green, blue bytes, every third byte belongs to one channel
+            data = pygame.image.tobytes(original, "RGB")
+            recolored = bytearray(len(data))
+            # copy whole channels with slices instead of looping over pixels
+            for new, old in enumerate(channels):
+                recolored[new::3] = data[old::3]
+            image = pygame.image.frombytes(bytes(recolored), original.get_size(), "RGB").convert()
+            self.images[key] = image
+        return image
+
+    def load_in_background(self, *paths):
+        """Start reading images from disk on a thread while the game starts
+
+        Images can only be converted once the screen exists, get_image()
+        converts them on the main thread when they are first used
+        """
+        self.loader = threading.Thread(target=self._load_files, args=(paths,),
+                                       name="assets", daemon=True)
+        self.loader.start()
+
+    def _load_files(self, paths):
+        """Loader thread, read every image in paths"""
+        for path in paths:
+            self.loaded[path] = pygame.image.load(path)
+
+    def get_font(self, size):
+        """Return shared default font of size, create it on first use
+
+        Same font as pygame.font.SysFont(None, size) without searching the
+        system for installed fonts first
+        """
+        font = self.fonts.get(size)
+        if font is None:
+            font = pygame.font.Font(None, size)
+            self.fonts[size] = font
+        return font
+
+    def preload(self, *paths):
+        """Load images before the game starts so no disk reads happen mid game"""
+        for path in paths:
+            self.get_image(path)
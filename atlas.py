@@ -0,0 +1,68 @@
+import pygame
+from waves import ALIEN_KINDS, kind_image  # use waves module
+
+# frames whole fleet cycles through while moving
+WALK_FRAMES = 2
+# frames of an alien exploding after it is shot
+EXPLODE_FRAMES = 4
+
+
+class AlienAtlas:
+    """A class to keep every alien animation frame in one surface
+
+    Atlas has one row per alien kind, walk frames followed by explosion
+    frames. Frames are subsurfaces of the atlas so every alien of a kind
+    shares the same pixels and drawing a frame copies nothing. A kind's row
+    is only recolored and drawn the first time a wave uses that kind.
+    """
+
+    def __init__(self, ai_game):
+        """Make empty atlas with a row for every alien kind"""
+        self.assets = ai_game.assets
+        base = self.assets.get_image("Images/alien.bmp")
+        self.width, self.height = base.get_size()
+        # letter of alien kind is the key and its row in the atlas is the value
+        self.kinds = {kind: row for row, kind in enumerate(ALIEN_KINDS)}
+        # atlas is in display pixel format so frames are drawn without conversion
+        self.surface = pygame.Surface((self.width * (WALK_FRAMES + EXPLODE_FRAMES),
+                                       self.height * len(self.kinds))).convert()
+        # background of alien image, explosions are drawn on it
+        self.background = base.get_at((0, 0))
+        self.surface.fill(self.background)
+        # walk and explosion frames of every kind, row of kind is the index
+        # None until a wave uses the kind
+        self.walk = [None] * len(self.kinds)
+        self.explode = [None] * len(self.kinds)
+
+    def row(self, kind):
+        """Return atlas row of alien kind, draw its frames the first time kind is used"""
+        row = self.kinds[kind]
+        if self.walk[row] is None:
+            image = kind_image(self.assets, kind)
+            cells = [self.surface.subsurface((col * self.width, row * self.height,
+                                              self.width, self.height))
+                     for col in range(WALK_FRAMES + EXPLODE_FRAMES)]
+            self._draw_walk(cells[:WALK_FRAMES], image)
+            self._draw_explosion(cells[WALK_FRAMES:], image, self.background)
+            self.walk[row] = tuple(cells[:WALK_FRAMES])
+            self.explode[row] = tuple(cells[WALK_FRAMES:])
+        return row
+
+    def _draw_walk(self, cells, image):
+        """Draw walk frames, alien and alien squashed down a little"""
+        cells[0].blit(image, (0, 0))
+        squash = 6
+        cells[1].blit(pygame.transform.smoothscale(image, (self.width, self.height - squash)),
+                      (0, squash))
+
+    def _draw_explosion(self, cells, image, background):
+        """Draw explosion frames, alien spinning, shrinking and glowing"""
+        # background has to be transparent so spinning alien has no box around it
+        sprite = image.copy()
+        sprite.set_colorkey(background)
+        sprite = sprite.convert_alpha()
+        center = (self.width // 2, self.height // 2)
+        for i, cell in enumerate(cells):
+            frame = pygame.transform.rotozoom(sprite, 30 * (i + 1), 1 - 0.22 * i)
+            frame.fill((255, 110, 0), special_flags=pygame.BLEND_RGB_ADD)
+            cell.blit(frame, frame.get_rect(center=center))
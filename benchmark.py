@@ -0,0 +1,187 @@
+import argparse  # Tools used to read command line options
+import gc  # Tools used to count garbage collections
+import json  # Tools used to write machine-readable results
+import os  # Tools used to hide pygame greeting so output is valid JSON
+import platform  # Tools used to report python version
+import subprocess  # Tools used to read current git commit
+import sys  # Tools used to count allocated memory blocks
+import time  # Tools used to time each tick
+import tracemalloc  # Tools used to measure peak memory
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+import pygame
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion  # use main game module
+from bot import SweepBot  # use bot module
+
+
+def _settings_default(settings):
+    """Default settings"""
+
+
+def _settings_max_bullets(settings):
+    """Very high bullets_allowed, bot fires every tick"""
+    settings.bullets_allowed = 1000
+
+
+def _settings_dense(settings):
+    """Large screen so the fleet has hundreds of aliens"""
+    settings.screen_width = 2560
+    settings.screen_height = 1440
+    settings.bullets_allowed = 30
+
+
+def _start_level_20(ai_game):
+    """Speed game up as if 20 fleets had been destroyed"""
+    for _ in range(20):
+        ai_game.settings.increase_speed()
+    ai_game.stats.level = 21
+    ai_game.sb.prep_level()
+
+
+def _tick_level_20(ai_game):
+    """Give ships back before every tick so the game never ends and drops to level 1 speed"""
+    ai_game.stats.ships_left = ai_game.settings.ship_limit
+
+
+def _tick_churn(ai_game):
+    """Hit the ship every tick so the fleet is rebuilt constantly"""
+    # game never ends, ships are given back before every hit
+    ai_game.stats.ships_left = ai_game.settings.ship_limit
+    ai_game._ship_hit()
+
+
+# every scenario has a function to change settings, a function run once after
+# the game starts and a function run before every tick
+SCENARIOS = {
+    "default": (_settings_default, None, None),
+    "max_bullets": (_settings_max_bullets, None, None),
+    "dense": (_settings_dense, None, None),
+    "level20": (_settings_default, _start_level_20, _tick_level_20),
+    "churn": (_settings_default, None, _tick_churn),
+}
+
+
+def _make_game(name, backend):
+    """Create headless game set up for scenario name and start it"""
+    configure, on_start, on_tick = SCENARIOS[name]
+    settings = Settings()
+    settings.fleet_backend = backend
+    # pauses after ship hits only waste ticks in a benchmark
+    settings.skip_pauses = True
+    configure(settings)
+    ai_game = AlienInvasion(headless=True, settings=settings, seed=0)
+    ai_game.step(("play",))
+    if on_start is not None:
+        on_start(ai_game)
+    return ai_game, on_tick
+
+
+def _run_ticks(ai_game, on_tick, bot, ticks, render, times=None):
+    """Run ticks ticks with bot playing, record duration of every tick in times"""
+    clock = time.perf_counter
+    for _ in range(ticks):
+        start = clock()
+        if on_tick is not None:
+            on_tick(ai_game)
+        ai_game.step(bot.act(ai_game))
+        if render:
+            ai_game._update_screen()
+        if times is not None:
+            times.append(clock() - start)
+
+
+def _percentile(sorted_values, percent):
+    """Return percentile of already sorted values"""
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * percent / 100))
+    return sorted_values[index]
+
+
+def run_scenario(name, ticks=5000, warmup=500, backend="sprites", render=False):
+    """Run scenario and return dictionary of measurements
+
+    Frame time is the time of one tick, including drawing when render is True.
+    Python does not count allocations, so allocation churn is reported as
+    objects tracked by the garbage collector allocated per tick (from gen 0
+    collections and counts) and net memory blocks allocated per tick.
+    """
+    ai_game, on_tick = _make_game(name, backend)
+    bot = SweepBot()
+    _run_ticks(ai_game, on_tick, bot, warmup, render)
+
+    times = []
+    gc.collect()
+    gc_before = gc.get_stats()[0]["collections"], gc.get_count()[0]
+    blocks_before = sys.getallocatedblocks()
+    start = time.perf_counter()
+    _run_ticks(ai_game, on_tick, bot, ticks, render, times)
+    elapsed = time.perf_counter() - start
+    blocks_after = sys.getallocatedblocks()
+    gc_after = gc.get_stats()[0]["collections"], gc.get_count()[0]
+    # every gen 0 collection happens after threshold more tracked objects were allocated
+    threshold = gc.get_threshold()[0]
+    tracked = (gc_after[0] - gc_before[0]) * threshold + gc_after[1] - gc_before[1]
+
+    # separate shorter run with tracemalloc because tracing slows every allocation down
+    tracemalloc.start()
+    _run_ticks(ai_game, on_tick, bot, min(ticks, 1000), render)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    times.sort()
+    return {
+        "scenario": name,
+        "backend": backend,
+        "render": render,
+        "ticks": ticks,
+        "ticks_per_second": ticks / elapsed,
+        "frame_ms_p50": _percentile(times, 50) * 1000,
+        "frame_ms_p95": _percentile(times, 95) * 1000,
+        "frame_ms_p99": _percentile(times, 99) * 1000,
+        "gc_objects_per_tick": tracked / ticks,
+        "net_blocks_per_tick": (blocks_after - blocks_before) / ticks,
+        "peak_memory_kib": peak / 1024,
+        "aliens": len(ai_game.aliens),
+        "level": ai_game.stats.level,
+        # draws of the last frame, only counted when frames are drawn
+        "blits_per_frame": ai_game.renderer.queue.blit_count if render else None,
+        "draw_calls_per_frame": ai_game.renderer.queue.call_count if render else None,
+    }
+
+
+def _git_commit():
+    """Return current git commit or None outside of a git checkout"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(description="Benchmark Alien Invasion scenarios")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS), metavar="SCENARIO",
+                        help=f"scenarios to run, default all of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--ticks", type=int, default=5000, help="ticks measured per scenario")
+    parser.add_argument("--warmup", type=int, default=500, help="ticks run before measuring")
+    parser.add_argument("--backend", default="sprites", choices=["sprites", "numpy"],
+                        help="fleet backend")
+    parser.add_argument("--render", action="store_true", help="draw every tick to offscreen screen")
+    parser.add_argument("--output", help="write JSON results to file instead of stdout")
+    args = parser.parse_args()
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name}, choose from: {', '.join(SCENARIOS)}")
+
+    results = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "results": [run_scenario(name, args.ticks, args.warmup, args.backend, args.render)
+                    for name in args.scenarios],
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
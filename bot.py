@@ -0,0 +1,75 @@
+import random  # Tools used to pick random moves
+
+
+class SweepBot:
+    """Simple scripted player for headless games
+
+    Bot starts the game, sweeps the ship from one edge of the screen to the
+    other and fires whenever it can. It only looks at the ship so it works with
+    every fleet backend. Without a seed it turns at the edges and always plays
+    the same way for the same settings. With a seed it starts in a random
+    direction and turns a random distance before each edge, so bots with
+    different seeds play different games.
+    """
+
+    def __init__(self, seed=None, max_margin=100):
+        """Initialize bot, seed picks starting direction and turning points"""
+        self.random = random.Random(seed) if seed is not None else None
+        self.max_margin = max_margin
+        # pixels before the edge the bot turns around at
+        self.margin = 0
+        self.direction = "right"
+        if self.random is not None:
+            self.direction = self.random.choice(("left", "right"))
+            self.margin = self.random.randint(0, max_margin)
+
+    def act(self, ai_game):
+        """Return actions for AlienInvasion.step() for the current game state"""
+        if not ai_game.stats.game_active:
+            return ("play",)
+        ship_rect = ai_game.ship.rect
+        # turn around at edges of the screen
+        if ship_rect.right >= ai_game.settings.screen_width - self.margin:
+            self._turn("left")
+        elif ship_rect.left <= self.margin:
+            self._turn("right")
+        return ("fire", self.direction)
+
+    def _turn(self, direction):
+        """Move in direction, seeded bot picks where it turns next time"""
+        if direction != self.direction and self.random is not None:
+            self.margin = self.random.randint(0, self.max_margin)
+        self.direction = direction
+
+
+class RandomBot:
+    """Player for headless games that picks random actions
+
+    Bot holds each random move for a while so the ship travels instead of
+    jittering. Same seed gives same moves.
+    """
+
+    def __init__(self, seed=None, hold_ticks=30):
+        """Initialize bot with its own random number generator"""
+        self.random = random.Random(seed)
+        self.hold_ticks = hold_ticks
+        self.ticks_left = 0
+        self.move = None
+
+    def act(self, ai_game):
+        """Return actions for AlienInvasion.step() for the current game state"""
+        if not ai_game.stats.game_active:
+            return ("play",)
+        # pick a new move after holding the old one long enough
+        if self.ticks_left <= 0:
+            self.move = self.random.choice(("left", "right", None))
+            self.ticks_left = self.hold_ticks
+        self.ticks_left -= 1
+        actions = ["fire"] if self.random.random() < 0.5 else []
+        if self.move is not None:
+            actions.append(self.move)
+        return actions
+
+
+# players that can be picked by name from the command line
+PLAYERS = {"sweep": SweepBot, "random": RandomBot}
@@ -1,40 +1,168 @@
+from array import array  # Tools used to pack bullet state into bytes
 import pygame
-from pygame.sprite import Sprite
+from renderer import SPRITES  # use renderer module
 
 
-# Bullet class inherits sprite
-class Bullet(Sprite):
-    """A class to manage bullets fired from ship"""
+class Bullet:
+    """A class to store one bullet fired from ship
 
-    def __init__(self, ai_game):
-        """Create bullet object at ship current position"""
-        # Inherit __init__() from sprite
-        super().__init__()
-        self.screen = ai_game.screen
-        self.settings = ai_game.settings
-        self.color = self.settings.bullet_color
+    Bullets are small records kept in a BulletPool and reused, __slots__ keeps
+    each record compact with no per-instance dictionary
+    """
 
+    __slots__ = ("rect", "y", "number")
+
+    def __init__(self, settings):
+        """Create bullet rect, bullet is placed when it is fired"""
         # Create a bullet rect at (0, 0) with width and height and then set correct position
         # Create a rectangle shape no image used
-        self.rect = pygame.Rect(0, 0, self.settings.bullet_width,
-                                self.settings.bullet_height)
-        # Bullet position is set to the top of ship position
-        self.rect.midtop = ai_game.ship.rect.midtop
+        self.rect = pygame.Rect(0, 0, settings.bullet_width,
+                                settings.bullet_height)
         # Store the bullet position as decimal value to make adjustments
+        self.y = 0.0
+        # bullets are numbered in firing order so network clients can follow them
+        self.number = 0
+
+    def fire(self, midtop):
+        """Place bullet at the top of ship position"""
+        self.rect.midtop = midtop
         self.y = float(self.rect.y)
 
-    # Manage bullets position
-    def update(self):
-        """Move bullet up the screen"""
+
+class BulletPool:
+    """A class to manage bullets fired from ship
+
+    Bullet records are created once and reused when fired again,
+    firing and removing bullets does not allocate new objects
+    """
+
+    def __init__(self, ai_game):
+        """Create pool of bullets for the allowed number of bullets"""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.color = self.settings.bullet_color
+        # bullets on screen, in the order they were fired
+        self.active = []
+        # bullets ready to be fired again
+        self.free = [Bullet(self.settings)
+                     for _ in range(self.settings.bullets_allowed)]
+        # one image of a bullet drawn for every active bullet in a single blits() call
+        self.image = pygame.Surface((self.settings.bullet_width,
+                                     self.settings.bullet_height))
+        self.image.fill(self.color)
+        # number of bullets fired so far
+        self.fired = 0
+
+    def __len__(self):
+        """Return number of bullets on screen"""
+        return len(self.active)
+
+    def __bool__(self):
+        """Return True if any bullet is on screen"""
+        return bool(self.active)
+
+    def __iter__(self):
+        """Iterate over bullets on screen"""
+        return iter(self.active)
+
+    def sprites(self):
+        """Return copy of list of bullets on screen, same as Group.sprites()"""
+        return list(self.active)
+
+    def fire(self, midtop):
+        """Fire bullet from midtop position"""
+        # reuse a free bullet, only create one if more bullets are allowed than were pooled
+        bullet = self.free.pop() if self.free else Bullet(self.settings)
+        bullet.fire(midtop)
+        bullet.number = self.fired
+        self.fired += 1
+        self.active.append(bullet)
+
+    def place(self, number, x, y):
+        """Put bullet number at x and exact y, used by network clients to copy a bullet fired elsewhere"""
+        bullet = self.free.pop() if self.free else Bullet(self.settings)
+        bullet.rect.x = x
+        bullet.y = y
+        bullet.rect.y = y
+        bullet.number = number
+        self.active.append(bullet)
+
+    def remove_numbers(self, numbers):
+        """Remove bullets with numbers from screen"""
+        numbers = set(numbers)
+        for bullet in [bullet for bullet in self.active if bullet.number in numbers]:
+            self.remove(bullet)
+
+    def remove(self, bullet):
+        """Remove bullet from screen and return it to the pool"""
+        self.active.remove(bullet)
+        self.free.append(bullet)
+
+    def empty(self):
+        """Remove every bullet from screen"""
+        self.free.extend(self.active)
+        self.active.clear()
+
+    def pack_state(self):
+        """Return bullets fired and every bullet on screen packed into bytes, used by snapshots
+
+        Bullets fired and bullet numbers are int64 values followed by x, y and
+        exact y of every bullet as float64 values
+        """
+        numbers = array("q", [self.fired])
+        values = array("d")
+        for bullet in self.active:
+            numbers.append(bullet.number)
+            values.extend((bullet.rect.x, bullet.rect.y, bullet.y))
+        return numbers.tobytes() + values.tobytes()
+
+    def unpack_state(self, data):
+        """Replace bullets on screen with bullets packed by pack_state()"""
+        count = (len(data) - 8) // 32
+        numbers = array("q")
+        numbers.frombytes(data[:8 + 8 * count])
+        values = array("d")
+        values.frombytes(data[8 + 8 * count:])
+        self.empty()
+        self.fired = numbers[0]
+        for i, number in enumerate(numbers[1:]):
+            bullet = self.free.pop() if self.free else Bullet(self.settings)
+            bullet.rect.x = values[3 * i]
+            bullet.rect.y = values[3 * i + 1]
+            bullet.y = values[3 * i + 2]
+            bullet.number = number
+            self.active.append(bullet)
+
+    def move(self, dt):
+        """Move bullets up the screen by distance travelled in dt seconds and return distance"""
         # x position of bullet never changes when fired
-        # Update decimal position of bullet
-        self.y -= self.settings.bullet_speed
-        # Update rect position
-        self.rect.y = self.y
+        distance = self.settings.bullet_speed * dt
+        for bullet in self.active:
+            # Update decimal position of bullet and rect position
+            bullet.y -= distance
+            bullet.rect.y = bullet.y
+        return distance
 
-    def draw_bullet(self):
-        """Draw bullet to screen"""
-        # draw bullet shape and fills bullet rect with color stored in self.color
-        pygame.draw.rect(self.screen, self.color, self.rect)
+    def remove_offscreen(self):
+        """Remove bullets that left the top of the screen
 
+        Called after collisions so a bullet that passed an alien on its way
+        off the screen still hits it
+        """
+        active = self.active
+        # bullets still on screen are moved to the front of the list in place
+        kept = 0
+        for bullet in active:
+            # If bullet position bottom is of the top screen it goes back to the pool
+            if bullet.rect.bottom <= 0:
+                self.free.append(bullet)
+            else:
+                active[kept] = bullet
+                kept += 1
+        del active[kept:]
 
+    def enqueue(self, queue):
+        """Add every bullet to render queue"""
+        # every bullet shares one image so it is drawn with the rest of the queue in one call
+        image = self.image
+        queue.extend(SPRITES, [(image, bullet.rect) for bullet in self.active])
@@ -1,4 +1,6 @@
 import pygame.font  # render text to the screen
+from text import glyph_cache  # shared cache of rendered text
+from renderer import UI  # top layer of render queue
 
 
 class Button:
@@ -15,8 +17,9 @@ class Button:
         self.button_color = (0, 255, 0)
         self.text_color = (255, 255, 255)
         # prepare font attribute for rendering text
-        # None tells pygame to use default font and 48 is the size of font
-        self.font = pygame.font.SysFont(None, 48)
+        # default font of size 48 is shared with scoreboard
+        self.assets = ai_game.assets
+        self.font = self.assets.get_font(48)
 
         # Build button rect object and center it
         # position button onto the screen
@@ -30,15 +33,16 @@ class Button:
         """Turn msg into a rendered image and center text on button"""
         # turn text into image , True - edge of text is smoother
         # Text background is set to same color as button
-        self.msg_image = self.font.render(msg, True, self.text_color,
-                                          self.button_color)
+        # label is rendered once per font and colors and shared after that
+        self.msg_image = glyph_cache(self.assets, self.font, self.text_color,
+                                     self.button_color).label(msg)
         self.msg_image_rect = self.msg_image.get_rect()
         # text is centered on the button
         self.msg_image_rect.center = self.rect.center
 
-    def draw_button(self):
-        """Draw blank button and draw message"""
+    def enqueue(self, queue):
+        """Add blank button and message to render queue"""
         # fill - draw rectangle portion of button
-        self.screen.fill(self.button_color, self.rect)
         # blit - draw text image to screen
-        self.screen.blit(self.msg_image, self.msg_image_rect)
+        queue.fill(UI, self.button_color, self.rect)
+        queue.blit(UI, self.msg_image, self.msg_image_rect)
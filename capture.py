@@ -0,0 +1,161 @@
+import multiprocessing  # Tools used to write frames in another process
+import os  # Tools used to make the output folder
+import queue  # Tools used to check for free buffers without waiting
+import shutil  # Tools used to find the video encoder
+import subprocess  # Tools used to pipe frames to the video encoder
+import sys  # Tools used to read byte order of pixels
+from multiprocessing import shared_memory  # Tools used to share frame buffers with the writer
+from time import perf_counter  # Tools used to time frame copies
+
+# output formats, "png" writes numbered images into a folder, "raw" writes
+# rgb24 frames one after another into one file and "ffmpeg" pipes them to
+# a local ffmpeg that encodes the video file
+FORMATS = ("png", "raw", "ffmpeg")
+
+
+def _pixel_format(surface):
+    """Return pygame.image.frombuffer() format of surface pixels in memory"""
+    if surface.get_bytesize() != 4:
+        raise ValueError("frame capture needs a 32 bit screen")
+    # byte each color is stored in, shifts count bits from the lowest byte
+    r, g, b, _ = (shift // 8 for shift in surface.get_shifts())
+    if sys.byteorder == "big":
+        r, g, b = 3 - r, 3 - g, 3 - b
+    formats = {(0, 1, 2): "RGBA", (2, 1, 0): "BGRA"}
+    if (r, g, b) not in formats:
+        raise ValueError(f"frame capture does not support pixel shifts {surface.get_shifts()}")
+    return formats[(r, g, b)]
+
+
+class FrameCapture:
+    """A class to stream presented frames to a background writer process
+
+    Frames are copied from the screen into a ring of buffers in shared memory
+    that is allocated once. Writer process turns buffers into PNG images, a
+    raw rgb24 stream or ffmpeg input and hands them back. When no buffer is
+    free the frame is dropped so the game never waits for the disk, unless
+    wait=True, used when rendering replays in batch.
+    """
+
+    def __init__(self, ai_game, path, format="png", buffers=8, fps=None, wait=False, writers=1):
+        """Allocate buffers and start writer processes for frames of ai_game screen
+
+        PNG images can be compressed by several writers at once, other formats
+        are one stream and always use one writer
+        """
+        if format not in FORMATS:
+            raise ValueError(f"unknown capture format {format}, pick one of {FORMATS}")
+        if format == "ffmpeg" and shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg capture format needs ffmpeg on PATH")
+        screen = ai_game.screen
+        self.size = screen.get_size()
+        self.pitch = screen.get_pitch()
+        self.frame_bytes = self.pitch * self.size[1]
+        self.pixel_format = _pixel_format(screen)
+        self.wait = wait
+        self.buffers = buffers
+        self.shared = shared_memory.SharedMemory(create=True, size=self.frame_bytes * buffers)
+        # writer hands back buffers it is done with through free, frames to write go through filled
+        self.free = multiprocessing.Queue()
+        self.filled = multiprocessing.Queue()
+        for buffer in range(buffers):
+            self.free.put(buffer)
+        # frames copied and frames dropped so far, and seconds spent copying
+        self.captured = 0
+        self.dropped = 0
+        self.copy_time = 0.0
+        fps = fps if fps is not None else ai_game.settings.max_fps
+        if format != "png":
+            writers = 1
+        if format == "png":
+            os.makedirs(path, exist_ok=True)
+        self.writers = [multiprocessing.Process(
+            target=_write_frames, name="capture writer", daemon=True,
+            args=(self.shared.name, self.size, self.pitch, self.pixel_format,
+                  self.free, self.filled, path, format, fps))
+            for _ in range(writers)]
+        for writer in self.writers:
+            writer.start()
+
+    def grab(self, surface):
+        """Copy surface into a free buffer and queue it for writing, drop it if none is free"""
+        try:
+            buffer = self._wait_for_buffer() if self.wait else self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        start = perf_counter()
+        offset = buffer * self.frame_bytes
+        # one copy straight from screen pixels into shared memory
+        pixels = surface.get_buffer()
+        self.shared.buf[offset:offset + self.frame_bytes] = memoryview(pixels)
+        del pixels
+        self.copy_time += perf_counter() - start
+        # frames are numbered in capture order, dropped frames leave no gap
+        self.filled.put((buffer, self.captured))
+        self.captured += 1
+        return True
+
+    def _wait_for_buffer(self):
+        """Return free buffer, waiting for writers as long as they are running"""
+        while True:
+            try:
+                return self.free.get(timeout=1)
+            except queue.Empty:
+                if not any(writer.is_alive() for writer in self.writers):
+                    raise RuntimeError("capture writer stopped") from None
+
+    def close(self):
+        """Write frames still queued, stop writer processes and free buffers"""
+        for _ in self.writers:
+            self.filled.put(None)
+        for writer in self.writers:
+            writer.join()
+        self.shared.close()
+        self.shared.unlink()
+
+    def report(self):
+        """Return text with frames captured, dropped and average copy time"""
+        copy_ms = self.copy_time * 1000 / max(self.captured, 1)
+        return (f"captured {self.captured} frames, dropped {self.dropped}, "
+                f"{copy_ms:.3f} ms per copy")
+
+
+def _write_frames(shared_name, size, pitch, pixel_format, free, filled, path, format, fps):
+    """Writer process, write every filled (buffer, frame number) and hand buffer back until None arrives"""
+    import pygame
+    shared = shared_memory.SharedMemory(name=shared_name)
+    frame_bytes = pitch * size[1]
+    encoder = None
+    output = None
+    if format == "raw":
+        output = open(path, "wb")
+    elif format == "ffmpeg":
+        # encoder reads rgb24 frames from its standard input
+        encoder = subprocess.Popen(
+            ["ffmpeg", "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{size[0]}x{size[1]}", "-r", str(fps), "-i", "-",
+             "-pix_fmt", "yuv420p", path], stdin=subprocess.PIPE)
+        output = encoder.stdin
+    try:
+        while True:
+            item = filled.get()
+            if item is None:
+                break
+            buffer, number = item
+            offset = buffer * frame_bytes
+            frame = pygame.image.frombuffer(shared.buf[offset:offset + frame_bytes],
+                                            size, pixel_format, pitch)
+            if format == "png":
+                pygame.image.save(frame, os.path.join(path, f"frame_{number:06d}.png"))
+            else:
+                output.write(pygame.image.tobytes(frame, "RGB"))
+            # frame surface uses the buffer, it has to go before the buffer is reused
+            del frame
+            free.put(buffer)
+    finally:
+        if output is not None:
+            output.close()
+        if encoder is not None:
+            encoder.wait()
+        shared.close()
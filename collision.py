@@ -0,0 +1,39 @@
+from math import ceil, floor  # Tools used to round swept areas outwards
+
+
+def swept_bounds(rect, dx, dy):
+    """Return left, top, right and bottom of area rect covers while moving by (dx, dy)
+
+    Area holds rect and rect moved by (dx, dy), fractions of a pixel are
+    rounded outwards so nothing the rect touched is left out
+    """
+    return (rect.left + floor(min(dx, 0)), rect.top + floor(min(dy, 0)),
+            rect.right + ceil(max(dx, 0)), rect.bottom + ceil(max(dy, 0)))
+
+
+def contact(rect, other, dx, dy):
+    """Return how far along (dx, dy) rect still touches other, from 0 to 1
+
+    Swept areas are built backwards in time, the rect moved by (dx, dy) is
+    where it was at the start of the tick. Of all rects a swept rect touches,
+    the one with the largest contact value was touched first.
+    """
+    reach = 1.0
+    if dx > 0:
+        reach = min(reach, (other.right - rect.left) / dx)
+    elif dx < 0:
+        reach = min(reach, (other.left - rect.right) / dx)
+    if dy > 0:
+        reach = min(reach, (other.bottom - rect.top) / dy)
+    elif dy < 0:
+        reach = min(reach, (other.top - rect.bottom) / dy)
+    return reach
+
+
+def first_hits(rect, hits, dx, dy):
+    """Return sprites in hits that rect touched first when sweeping by (dx, dy)"""
+    if len(hits) < 2:
+        return hits
+    reach = [contact(rect, hit.rect, dx, dy) for hit in hits]
+    first = max(reach)
+    return [hit for hit, value in zip(hits, reach) if value == first]
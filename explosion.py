@@ -0,0 +1,85 @@
+from array import array  # Tools used to pack explosions into bytes
+from atlas import EXPLODE_FRAMES  # use atlas module
+from renderer import SPRITES  # use renderer module
+
+
+class Explosions:
+    """A class to show aliens exploding after they are shot
+
+    Explosions are kept in a ring buffer that is allocated once. Every
+    explosion lasts explosion_time, so the oldest one always ends first and
+    ending explosions only moves the start of the ring. Frames are picked
+    from one clock shared by every explosion.
+    """
+
+    def __init__(self, ai_game, capacity=64):
+        """Initialize empty ring buffer for capacity explosions"""
+        self.settings = ai_game.settings
+        self.frames = ai_game.atlas.explode
+        self.capacity = capacity
+        # position, atlas row of alien kind and start time of every explosion
+        self.position = [(0, 0)] * capacity
+        self.kind = [0] * capacity
+        self.start = [0.0] * capacity
+        # index of oldest explosion and number of explosions shown
+        self.head = 0
+        self.count = 0
+        # seconds since game started, shared by every explosion
+        self.time = 0.0
+
+    def __len__(self):
+        """Return number of explosions shown"""
+        return self.count
+
+    def add(self, x, y, kind):
+        """Start explosion of alien kind (atlas row) at x, y"""
+        # when ring is full oldest explosion makes room
+        if self.count == self.capacity:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+        i = (self.head + self.count) % self.capacity
+        self.position[i] = (x, y)
+        self.kind[i] = kind
+        self.start[i] = self.time
+        self.count += 1
+
+    def update(self, dt):
+        """Advance clock by dt seconds and end explosions that are over"""
+        self.time += dt
+        duration = self.settings.explosion_time
+        while self.count and self.time - self.start[self.head] >= duration:
+            self.head = (self.head + 1) % self.capacity
+            self.count -= 1
+
+    def empty(self):
+        """Remove every explosion"""
+        self.count = 0
+
+    def pack_state(self):
+        """Return x, y, kind and start time of every explosion packed into float64 bytes"""
+        values = array("d")
+        for n in range(self.count):
+            i = (self.head + n) % self.capacity
+            values.extend((*self.position[i], self.kind[i], self.start[i]))
+        return values.tobytes()
+
+    def unpack_state(self, data, time):
+        """Replace explosions with explosions packed by pack_state(), clock is set to time"""
+        values = array("d")
+        values.frombytes(data)
+        self.time = time
+        self.head = 0
+        self.count = 0
+        for i in range(0, len(values), 4):
+            self.add(int(values[i]), int(values[i + 1]), int(values[i + 2]))
+            # add() starts explosion now, packed start time is kept instead
+            self.start[(self.head + self.count - 1) % self.capacity] = values[i + 3]
+
+    def enqueue(self, queue):
+        """Add current frame of every explosion to render queue"""
+        frame_time = self.settings.explosion_time / EXPLODE_FRAMES
+        last = EXPLODE_FRAMES - 1
+        for n in range(self.count):
+            i = (self.head + n) % self.capacity
+            frame = min(int((self.time - self.start[i]) / frame_time), last)
+            queue.blit(SPRITES, self.frames[self.kind[i]][frame], self.position[i])
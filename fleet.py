@@ -0,0 +1,293 @@
+from array import array  # Tools used to pack fleet state into bytes
+from pygame.sprite import Group
+from alien import Alien  # use alien module
+from renderer import SPRITES  # use renderer module
+from atlas import WALK_FRAMES  # use atlas module
+from collision import swept_bounds, first_hits  # use collision module
+from waves import ALIEN_KINDS  # use waves module
+
+
+class Fleet(Group):
+    """Group of alien sprites that keeps track of the fleet bounding box
+
+    Whole fleet moves together so the leftmost, rightmost and lowest aliens
+    stay the same until they are shot. The group remembers those aliens so
+    edge and bottom checks look at 3 aliens instead of the whole fleet.
+
+    Aliens are also stored in a grid of cells matching the fleet layout
+    (one cell per column and row of the wave layout) so a bullet is only
+    tested against aliens in the cells it overlaps.
+
+    Alien sprites are kept in a pool and placed again for every new wave, so
+    new aliens are only created when a wave is larger than any before it.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize empty fleet"""
+        super().__init__()
+        self.ai_game = ai_game
+        self.screen_rect = ai_game.screen.get_rect()
+        # size of one alien and of one grid cell, aliens are 1 alien width/height apart
+        self.alien_width, self.alien_height = ai_game.assets.get_image(
+            "Images/alien.bmp").get_size()
+        self.cell_width = 2 * self.alien_width
+        self.cell_height = 2 * self.alien_height
+        # (column, row) of grid cell is the key and alien in that cell is the value
+        self.cells = {}
+        # every alien sprite made so far, reused by spawn()
+        self.pool = []
+        # image of every alien kind, made once before the game starts
+        self.settings = ai_game.settings
+        # animation frames of every alien kind
+        self.atlas = ai_game.atlas
+        # seconds fleet has moved, picks walk frame of every alien at once
+        self.anim_time = 0.0
+        # pixels whole fleet moved right and down since it was spawned
+        self.shift_x = 0.0
+        self.shift_y = 0
+        # number of fleets spawned so far
+        self.spawns = 0
+        # aliens at the edges of the fleet bounding box
+        self.leftmost = None
+        self.rightmost = None
+        self.lowest = None
+        # set when an edge alien is removed, bounding box is found again when needed
+        self._bounds_dirty = False
+
+    def add_internal(self, sprite, *args):
+        """Add alien and grow bounding box if alien is outside of it"""
+        super().add_internal(sprite, *args)
+        # aliens placed by spawn() know their column and row
+        if sprite.col is not None:
+            self.cells[(sprite.col, sprite.row)] = sprite
+        if not self._bounds_dirty:
+            self._include(sprite)
+
+    def remove_internal(self, sprite):
+        """Remove alien, bounding box is only rebuilt if alien was at an edge"""
+        super().remove_internal(sprite)
+        if sprite.col is not None and self.cells.get((sprite.col, sprite.row)) is sprite:
+            del self.cells[(sprite.col, sprite.row)]
+        if sprite is self.leftmost or sprite is self.rightmost or sprite is self.lowest:
+            self._bounds_dirty = True
+
+    def spawn(self, layout):
+        """Replace fleet with aliens placed from layout (waves.FleetLayout)"""
+        self.empty()
+        self.leftmost = self.rightmost = self.lowest = None
+        self._bounds_dirty = False
+        self.shift_x = 0.0
+        self.shift_y = 0
+        self.spawns += 1
+        # pool only grows when this wave has more aliens than any wave before
+        for _ in range(len(layout) - len(self.pool)):
+            self.pool.append(Alien(self.ai_game))
+        atlas = self.atlas
+        for slot, (alien, (col, row, x, y, kind)) in enumerate(zip(self.pool, layout.slots)):
+            row_of_kind = atlas.row(kind)
+            alien.place(slot, col, row, x, y, atlas.walk[row_of_kind], row_of_kind,
+                        ALIEN_KINDS[kind]["points"])
+        self.add(self.pool[:len(layout)])
+
+    def pack_state(self):
+        """Return layout slot, x and y of every alien packed into bytes, used by snapshots
+
+        Slots are int32 values followed by x and y as float64 values, same
+        layout as ArrayFleet.pack_state() so snapshots work with both backends
+        """
+        aliens = self.sprites()
+        return (array("i", [alien.slot for alien in aliens]).tobytes()
+                + array("d", [alien.x for alien in aliens]).tobytes()
+                + array("d", [alien.rect.y for alien in aliens]).tobytes())
+
+    def unpack_state(self, layout, data):
+        """Replace fleet with aliens of layout packed by pack_state()"""
+        count = len(data) // 20
+        slots = array("i")
+        slots.frombytes(data[:4 * count])
+        x = array("d")
+        x.frombytes(data[4 * count:12 * count])
+        y = array("d")
+        y.frombytes(data[12 * count:])
+        self.empty()
+        self.leftmost = self.rightmost = self.lowest = None
+        self._bounds_dirty = False
+        for _ in range(count - len(self.pool)):
+            self.pool.append(Alien(self.ai_game))
+        atlas = self.atlas
+        for alien, slot, alien_x, alien_y in zip(self.pool, slots, x, y):
+            col, row, _, _, kind = layout.slots[slot]
+            row_of_kind = atlas.row(kind)
+            alien.place(slot, col, row, alien_x, int(alien_y), atlas.walk[row_of_kind],
+                        row_of_kind, ALIEN_KINDS[kind]["points"])
+        self.add(self.pool[:count])
+        # every alien moved the same way, so any alien tells how far the fleet moved
+        if count:
+            _, _, layout_x, layout_y, _ = layout.slots[slots[0]]
+            self.shift_x = self.pool[0].x - layout_x
+            self.shift_y = self.pool[0].rect.y - layout_y
+        else:
+            self.shift_x = 0.0
+            self.shift_y = 0
+
+    def alive_slots(self):
+        """Return set of layout slots of aliens alive"""
+        return {alien.slot for alien in self.sprites()}
+
+    def remove_slots(self, slots, explosions=None):
+        """Remove aliens at layout slots, they explode if explosions is given"""
+        slots = set(slots)
+        hit = [alien for alien in self.sprites() if alien.slot in slots]
+        if explosions is not None:
+            self.explode(hit, explosions)
+        for alien in hit:
+            alien.kill()
+
+    def points(self, hit):
+        """Return points multiplier of aliens in hit, a list from collide_bullets"""
+        return sum(alien.points for alien in hit)
+
+    def explode(self, hit, explosions):
+        """Start explosions where aliens in hit were, a list from collide_bullets"""
+        for alien in hit:
+            explosions.add(alien.rect.x, alien.rect.y, alien.kind)
+
+    def animate(self, dt):
+        """Advance fleet animation by dt seconds"""
+        self.anim_time += dt
+
+    def _include(self, alien):
+        """Grow bounding box to include alien"""
+        rect = alien.rect
+        if self.leftmost is None or rect.left < self.leftmost.rect.left:
+            self.leftmost = alien
+        if self.rightmost is None or rect.right > self.rightmost.rect.right:
+            self.rightmost = alien
+        if self.lowest is None or rect.bottom > self.lowest.rect.bottom:
+            self.lowest = alien
+
+    def _update_bounds(self):
+        """Find edge aliens again after an edge alien was removed"""
+        self.leftmost = self.rightmost = self.lowest = None
+        for alien in self.sprites():
+            self._include(alien)
+        self._bounds_dirty = False
+
+    def edge_room(self, direction):
+        """Return pixels fleet can move in direction (1 right, -1 left) before it touches an edge"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        if self.leftmost is None:
+            return 0.0
+        if direction > 0:
+            return self.screen_rect.right - (self.rightmost.x + self.alien_width)
+        return self.leftmost.x
+
+    def move(self, distance):
+        """Move every alien distance pixels to the right, negative moves left"""
+        self.shift_x += distance
+        for alien in self.sprites():
+            alien.x += distance
+            alien.rect.x = alien.x
+
+    def drop(self, amount):
+        """Move whole fleet down by amount pixels"""
+        self.shift_y += amount
+        for alien in self.sprites():
+            alien.rect.y += amount
+
+    def reached_bottom(self, bottom):
+        """Return True if any alien reached bottom y coordinate"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        if self.lowest is None:
+            return False
+        return self.lowest.rect.bottom >= bottom
+
+    def collide_rect(self, rect):
+        """Return True if any alien overlaps rect"""
+        if self._bounds_dirty:
+            self._update_bounds()
+        # nothing can overlap rect if whole fleet is above or beside it
+        if (self.lowest is None or self.lowest.rect.bottom <= rect.top
+                or self.leftmost.rect.left >= rect.right
+                or self.rightmost.rect.right <= rect.left):
+            return False
+        for alien in self.sprites():
+            if alien.rect.colliderect(rect):
+                return True
+        return False
+
+    def enqueue(self, queue):
+        """Add current walk frame of every alien to render queue"""
+        frame = int(self.anim_time / self.settings.alien_frame_time) % WALK_FRAMES
+        queue.extend(SPRITES, [(alien.frames[frame], alien.rect) for alien in self.sprites()])
+
+    def collide_bullets(self, bullets, dx=0, dy=0):
+        """Remove bullets and aliens that collide
+
+        Every bullet is swept by (dx, dy), the way back to where it was at the
+        start of the tick relative to the aliens, so a fast bullet can not pass
+        through an alien between two ticks. A bullet only destroys the aliens
+        it touched first.
+
+        Returns dictionary of bullet and list of aliens hit by that bullet
+        """
+        # aliens without a grid cell fall back to testing every bullet against every alien
+        if len(self.cells) != len(self):
+            return self._collide_all(bullets, dx, dy)
+        collisions = {}
+        if not self.cells:
+            return collisions
+        if self._bounds_dirty:
+            self._update_bounds()
+        # fleet moved as one body since it was created, so grid moved by the same offset
+        # offset is found from any alien, here the leftmost one
+        anchor = self.leftmost
+        origin_x = anchor.rect.x - self.alien_width - anchor.col * self.cell_width
+        origin_y = anchor.rect.y - self.alien_height - anchor.row * self.cell_height
+        # same order as groupcollide, an alien hit by an earlier bullet is already gone
+        for bullet in bullets:
+            left, top, right, bottom = swept_bounds(bullet.rect, dx, dy)
+            # columns and rows of cells swept area can overlap
+            first_col = (left - origin_x - 2 * self.alien_width) // self.cell_width
+            last_col = (right - origin_x - self.alien_width) // self.cell_width
+            first_row = (top - origin_y - 2 * self.alien_height) // self.cell_height
+            last_row = (bottom - origin_y - self.alien_height) // self.cell_height
+            hit = []
+            for col in range(first_col, last_col + 1):
+                for row in range(first_row, last_row + 1):
+                    alien = self.cells.get((col, row))
+                    if alien is not None:
+                        rect = alien.rect
+                        if (rect.left < right and rect.right > left
+                                and rect.top < bottom and rect.bottom > top):
+                            hit.append(alien)
+            if hit:
+                hit = first_hits(bullet.rect, hit, dx, dy)
+                # delete aliens that collided
+                for alien in hit:
+                    alien.kill()
+                collisions[bullet] = hit
+        # delete bullets that collided
+        for bullet in collisions:
+            bullets.remove(bullet)
+        return collisions
+
+    def _collide_all(self, bullets, dx, dy):
+        """Test every swept bullet against every alien"""
+        collisions = {}
+        for bullet in bullets:
+            left, top, right, bottom = swept_bounds(bullet.rect, dx, dy)
+            hit = [alien for alien in self.sprites()
+                   if alien.rect.left < right and alien.rect.right > left
+                   and alien.rect.top < bottom and alien.rect.bottom > top]
+            if hit:
+                hit = first_hits(bullet.rect, hit, dx, dy)
+                # delete aliens hit by bullet
+                for alien in hit:
+                    alien.kill()
+                collisions[bullet] = hit
+        for bullet in collisions:
+            bullets.remove(bullet)
+        return collisions
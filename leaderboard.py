@@ -0,0 +1,133 @@
+import argparse  # Tools used to read command line options
+import hashlib  # Tools used to name settings profiles
+import json  # Tools used to store profile settings
+import queue  # Tools used to hand work to the writer thread
+import sqlite3  # Tools used to store scores on disk
+import threading  # Tools used to write scores in the background
+import time  # Tools used to date every run
+
+# settings that change how the game looks or runs but not how it plays
+# games played with different values of these share one leaderboard
+_PRESENTATION_SETTINGS = ("render_mode", "profile_path", "leaderboard_path",
+                          "fleet_backend", "max_fps", "pipeline", "frame_buffers")
+
+
+def profile_key(settings):
+    """Return short name of the settings profile a game is played with"""
+    snapshot = {name: value for name, value in settings.snapshot().items()
+                if name not in _PRESENTATION_SETTINGS}
+    text = json.dumps(snapshot, sort_keys=True)
+    return hashlib.sha1(text.encode()).hexdigest()[:12], text
+
+
+def _connect(path):
+    """Open database and create tables on first use"""
+    connection = sqlite3.connect(path)
+    # write ahead log lets readers see committed scores while the writer works
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("CREATE TABLE IF NOT EXISTS profiles "
+                       "(profile TEXT PRIMARY KEY, settings TEXT NOT NULL)")
+    connection.execute("CREATE TABLE IF NOT EXISTS runs "
+                       "(id INTEGER PRIMARY KEY, profile TEXT NOT NULL, score INTEGER NOT NULL, "
+                       "level INTEGER NOT NULL, played_at REAL NOT NULL)")
+    # best scores of a profile are read from this index without scanning every run
+    connection.execute("CREATE INDEX IF NOT EXISTS runs_by_score "
+                       "ON runs (profile, score DESC)")
+    connection.commit()
+    return connection
+
+
+def top_scores(path, profile, n=10):
+    """Return best n (score, level, played_at) rows of profile, best first"""
+    connection = _connect(path)
+    try:
+        return connection.execute(
+            "SELECT score, level, played_at FROM runs WHERE profile = ? "
+            "ORDER BY score DESC LIMIT ?", (profile, n)).fetchall()
+    finally:
+        connection.close()
+
+
+class Leaderboard:
+    """A class to keep scores of every finished game in a SQLite file
+
+    All disk work happens on a writer thread, the game only puts finished
+    games on a queue and never waits for the disk. Best score of the profile
+    is read by the same thread when it starts and picked up with poll_best().
+    """
+
+    def __init__(self, ai_game):
+        """Start writer thread for database at settings.leaderboard_path"""
+        self.path = ai_game.settings.leaderboard_path
+        self.profile, self.profile_settings = profile_key(ai_game.settings)
+        # finished games waiting to be written, None stops the thread
+        self.queue = queue.Queue()
+        # best score on disk once writer thread has read it, None until then
+        self.best = None
+        self._best_taken = False
+        self.thread = threading.Thread(target=self._run, name="leaderboard", daemon=True)
+        self.thread.start()
+
+    def record(self, score, level):
+        """Save a finished game in the background"""
+        self.queue.put((score, level, time.time()))
+
+    def poll_best(self):
+        """Return best saved score once it has been loaded, None before and after that"""
+        if self.best is None or self._best_taken:
+            return None
+        self._best_taken = True
+        return self.best
+
+    def top(self, n=10):
+        """Return best n saved games of this profile, reads disk so not for use during play"""
+        return top_scores(self.path, self.profile, n)
+
+    def close(self):
+        """Write games still in queue and stop writer thread"""
+        self.queue.put(None)
+        self.thread.join()
+
+    def _run(self):
+        """Writer thread, load best score then write queued games"""
+        connection = _connect(self.path)
+        try:
+            with connection:
+                connection.execute("INSERT OR IGNORE INTO profiles VALUES (?, ?)",
+                                   (self.profile, self.profile_settings))
+            best = connection.execute("SELECT MAX(score) FROM runs WHERE profile = ?",
+                                      (self.profile,)).fetchone()[0]
+            self.best = best or 0
+            while True:
+                runs = [self.queue.get()]
+                # games that finished meanwhile are written in the same transaction
+                while True:
+                    try:
+                        runs.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = None in runs
+                runs = [run for run in runs if run is not None]
+                # each batch is committed as a whole or not at all
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO runs (profile, score, level, played_at) VALUES (?, ?, ?, ?)",
+                        [(self.profile,) + run for run in runs])
+                if stop:
+                    return
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":  # If file is called directly
+    from settings import Settings  # use settings module
+    parser = argparse.ArgumentParser(description="Show best Alien Invasion scores")
+    parser.add_argument("--path", default=Settings().leaderboard_path, help="leaderboard file")
+    parser.add_argument("--profile", help="settings profile, default is profile of default settings")
+    parser.add_argument("-n", type=int, default=10, help="number of scores to show")
+    args = parser.parse_args()
+    profile = args.profile or profile_key(Settings())[0]
+    print(f"profile {profile}")
+    for rank, (score, level, played_at) in enumerate(top_scores(args.path, profile, args.n), 1):
+        played = time.strftime("%Y-%m-%d %H:%M", time.localtime(played_at))
+        print(f"{rank:>3}. {score:>10,}  level {level:<3} {played}")
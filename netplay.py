@@ -0,0 +1,704 @@
+import argparse  # Tools used to read command line options
+import json  # Tools used to send settings to clients
+import multiprocessing  # Tools used to run the loopback server in its own process
+import selectors  # Tools used to serve many sockets from one thread
+import socket  # Tools used to talk to clients over the network
+import struct  # Tools used to pack messages into bytes
+import zlib  # Tools used to checksum game state
+from time import perf_counter  # Tools used to time ticks and input latency
+import pygame
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion, PLAYING  # use main game module
+from bot import PLAYERS  # use bot module
+import snapshot  # use snapshot module
+
+# input bits sent by clients, left and right are held, fire and play are presses
+LEFT = 1
+RIGHT = 2
+FIRE = 4
+PLAY = 8
+_ACTION_BITS = {"left": LEFT, "right": RIGHT, "fire": FIRE, "play": PLAY}
+
+# sections of a state delta, a section is only sent when its flag is set
+# and sections follow each other in this order
+MOVED = 1  # game rules ran this tick, bullets moved and aliens walked
+SPEEDS = 2  # bullet speed changed
+SPAWN = 4  # new fleet spawned for a level
+REMOVED = 8  # aliens shot, they explode
+CLEARED = 16  # aliens removed because ship was hit, they vanish
+SHIFT = 32  # fleet moved
+SHIP = 64  # ship moved
+BULLETS = 128  # bullets removed and bullets fired
+STATS = 256  # score, high score, level, ships left or game active changed
+ACK = 512  # last input applied
+CHECK = 1024  # checksum of game state, clients use it to find out they went out of sync
+
+# every message is sent with its length in front
+_LENGTH = struct.Struct("!H")
+# client input, sequence number and input bits, sent without a length
+_INPUT = struct.Struct("!HB")
+# server hello, lengths of settings and snapshot that follow
+_JOIN = struct.Struct("!HH")
+# state delta, tick and section flags, then sections
+_DELTA = struct.Struct("!HH")
+_SPEEDS = struct.Struct("!d")
+_SPAWN = struct.Struct("!H")
+_SHIFT = struct.Struct("!fh")
+_SHIP = struct.Struct("!h")
+# bullet fired, number, x and exact y
+_FIRED = struct.Struct("!Hhd")
+# score, high score, level, ships left, game active
+_STATS = struct.Struct("!qqHb?")
+_SEQUENCE = struct.Struct("!H")
+_CHECK = struct.Struct("!I")
+_COUNT = struct.Struct("!H")
+# ticks between checksums
+CHECK_INTERVAL = 120
+
+
+def _pack_numbers(numbers):
+    """Return count and list of 16 bit numbers packed into bytes"""
+    return _COUNT.pack(len(numbers)) + struct.pack(f"!{len(numbers)}H", *numbers)
+
+
+def _unpack_numbers(data, offset):
+    """Return numbers packed by _pack_numbers() at offset and offset after them"""
+    (count,) = _COUNT.unpack_from(data, offset)
+    offset += _COUNT.size
+    return struct.unpack_from(f"!{count}H", data, offset), offset + 2 * count
+
+
+def _frame(payload):
+    """Return payload with its length in front"""
+    if len(payload) > 0xFFFF:
+        raise ValueError(f"message of {len(payload)} bytes is too long")
+    return _LENGTH.pack(len(payload)) + payload
+
+
+def _stats(ai_game):
+    """Return stats sent to clients as a tuple"""
+    stats = ai_game.stats
+    return (stats.score, stats.high_score, stats.level, stats.ships_left, stats.game_active)
+
+
+def _bullet_numbers(ai_game):
+    """Return 16 bit numbers of bullets on screen in firing order"""
+    return [bullet.number & 0xFFFF for bullet in ai_game.bullets]
+
+
+def _checksum(ai_game):
+    """Return checksum of state server and clients both know exactly"""
+    stats = ai_game.stats
+    alive = sorted(ai_game.aliens.alive_slots())
+    bullets = [value for bullet in ai_game.bullets
+               for value in (bullet.number & 0xFFFF, bullet.rect.y)]
+    data = (struct.pack("!qHbh", stats.score, stats.level, stats.ships_left, ai_game.ship.rect.x)
+            + struct.pack(f"!{len(alive)}H", *alive)
+            + struct.pack(f"!{len(bullets)}h", *bullets))
+    return zlib.crc32(data)
+
+
+class Session:
+    """A class to host one game for one client of Server
+
+    Game runs headless on the server, every tick the client gets only what
+    changed since the tick before. Last values sent are kept to find changes.
+    """
+
+    def __init__(self, sock, settings):
+        """Start a new game with a copy of settings for client on sock"""
+        self.sock = sock
+        game_settings = Settings()
+        game_settings.load_snapshot(settings.snapshot())
+        self.game = AlienInvasion(headless=True, settings=game_settings)
+        # bytes read and not handled yet, bytes to send
+        self.received = bytearray()
+        self.outgoing = bytearray()
+        # inputs held, presses not applied yet and sequence number of newest input
+        self.held = 0
+        self.presses = 0
+        self.sequence = None
+        # last state sent to client
+        game = self.game
+        self.bullet_speed = game.settings.bullet_speed
+        self.spawns = game.aliens.spawns
+        self.alive = game.aliens.alive_slots()
+        self.count = len(game.aliens)
+        self.shift = (game.aliens.shift_x, game.aliens.shift_y)
+        self.ship_x = game.ship.rect.x
+        self.bullets = _bullet_numbers(game)
+        self.stats = _stats(game)
+        # ticks run, bytes sent and seconds spent on rules and on deltas
+        self.ticks = 0
+        self.bytes_sent = 0
+        self.largest = 0
+        self.sim_time = 0.0
+        self.delta_time = 0.0
+        self._send(self._join())
+
+    def _join(self):
+        """Return first message, settings and a snapshot of the whole game"""
+        settings = json.dumps(self.game.settings.snapshot()).encode()
+        state = snapshot.take(self.game)
+        return _JOIN.pack(len(settings), len(state)) + settings + state
+
+    def read(self):
+        """Read input sent by client, return False once client disconnected"""
+        try:
+            data = self.sock.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return True
+        except ConnectionError:
+            return False
+        if not data:
+            return False
+        self.received += data
+        size = _INPUT.size
+        end = len(self.received) - len(self.received) % size
+        for offset in range(0, end, size):
+            self.sequence, bits = _INPUT.unpack_from(self.received, offset)
+            self.held = bits & (LEFT | RIGHT)
+            # presses are kept until a tick applies them
+            self.presses |= bits & (FIRE | PLAY)
+        del self.received[:end]
+        return True
+
+    def tick(self, dt):
+        """Run one tick with input received so far and queue the state delta"""
+        start = perf_counter()
+        game = self.game
+        actions = [name for name, bit in _ACTION_BITS.items()
+                   if bit & (self.held | self.presses)]
+        self.presses = 0
+        # input is applied the same way step() applies it, then one tick runs
+        game.step(actions, ticks=0)
+        moved = game.state == PLAYING and game.stats.game_active
+        game._update_game(dt)
+        self.ticks += 1
+        middle = perf_counter()
+        self._send(self._delta(moved))
+        self.sim_time += middle - start
+        self.delta_time += perf_counter() - middle
+
+    def _delta(self, moved):
+        """Return delta of everything that changed since last tick"""
+        game = self.game
+        aliens = game.aliens
+        flags = MOVED if moved else 0
+        parts = []
+        stats = _stats(game)
+        if game.settings.bullet_speed != self.bullet_speed:
+            self.bullet_speed = game.settings.bullet_speed
+            flags |= SPEEDS
+            parts.append(_SPEEDS.pack(self.bullet_speed))
+        if aliens.spawns != self.spawns:
+            self.spawns = aliens.spawns
+            flags |= SPAWN
+            parts.append(_SPAWN.pack(game.stats.level))
+            # new fleet starts with every slot of its layout alive
+            self.alive = set(range(len(game._fleet_layout())))
+            self.count = None
+        # alive aliens are only compared when their number changed
+        count = len(aliens)
+        if count != self.count:
+            alive = aliens.alive_slots()
+            removed = self.alive - alive
+            if removed:
+                # aliens removed because ship was hit vanish, aliens shot explode
+                ship_hit = stats[3] < self.stats[3] or (self.stats[4] and not stats[4])
+                flags |= CLEARED if ship_hit else REMOVED
+                parts.append(_pack_numbers(sorted(removed)))
+            self.alive = alive
+            self.count = count
+        shift = (aliens.shift_x, aliens.shift_y)
+        if shift != self.shift:
+            self.shift = shift
+            flags |= SHIFT
+            parts.append(_SHIFT.pack(*shift))
+        if game.ship.rect.x != self.ship_x:
+            self.ship_x = game.ship.rect.x
+            flags |= SHIP
+            parts.append(_SHIP.pack(self.ship_x))
+        numbers = _bullet_numbers(game)
+        if numbers != self.bullets:
+            before = set(self.bullets)
+            now = set(numbers)
+            fired = [bullet for bullet in game.bullets if bullet.number & 0xFFFF not in before]
+            flags |= BULLETS
+            parts.append(_pack_numbers([number for number in self.bullets if number not in now]))
+            parts.append(_COUNT.pack(len(fired)))
+            parts.extend(_FIRED.pack(bullet.number & 0xFFFF, bullet.rect.x, bullet.y)
+                         for bullet in fired)
+            self.bullets = numbers
+        if stats != self.stats:
+            self.stats = stats
+            flags |= STATS
+            parts.append(_STATS.pack(*stats))
+        if self.sequence is not None:
+            flags |= ACK
+            parts.append(_SEQUENCE.pack(self.sequence))
+            self.sequence = None
+        if game.tick_count % CHECK_INTERVAL == 0:
+            flags |= CHECK
+            parts.append(_CHECK.pack(_checksum(game)))
+        return _DELTA.pack(game.tick_count & 0xFFFF, flags) + b"".join(parts)
+
+    def _send(self, payload):
+        """Queue payload for client"""
+        message = _frame(payload)
+        self.outgoing += message
+        self.bytes_sent += len(message)
+        self.largest = max(self.largest, len(message))
+
+    def flush(self):
+        """Send as much of queued bytes as socket takes, return True if some are left"""
+        try:
+            sent = self.sock.send(self.outgoing)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except ConnectionError:
+            # client is gone, read() notices and the session ends
+            sent = len(self.outgoing)
+        del self.outgoing[:sent]
+        return bool(self.outgoing)
+
+
+class Server:
+    """A class to run authoritative games for many clients
+
+    Every client that connects gets its own headless game. All games run in
+    one thread on one fixed tick clock, inputs are read between ticks and
+    every tick each client is sent a small delta of its game. Run more
+    server processes to use more cores.
+    """
+
+    def __init__(self, address=("127.0.0.1", 0), settings=None):
+        """Listen on address, port 0 picks a free port"""
+        self.settings = settings if settings is not None else Settings()
+        self.listener = socket.create_server(address)
+        self.listener.setblocking(False)
+        self.address = self.listener.getsockname()
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.listener, selectors.EVENT_READ)
+        self.sessions = []
+        # totals of sessions that ended, sessions are dropped once they are counted
+        self.ended = self._totals([])
+        # ticks of the server clock and ticks that started late
+        self.ticks = 0
+        self.late_ticks = 0
+
+    def serve(self, should_stop=lambda: False):
+        """Run games until should_stop() returns True"""
+        dt = 1 / self.settings.tick_rate
+        next_tick = perf_counter()
+        while not should_stop():
+            for key, mask in self.selector.select(max(next_tick - perf_counter(), 0)):
+                if key.data is None:
+                    self._accept()
+                elif mask & selectors.EVENT_READ and not key.data.read():
+                    self._close(key.data)
+                elif mask & selectors.EVENT_WRITE:
+                    self._flush(key.data)
+            now = perf_counter()
+            # after a long stall only catch up a limited amount of time
+            if now - next_tick > self.settings.max_frame_time:
+                next_tick = now - self.settings.max_frame_time
+            if next_tick <= now - dt:
+                self.late_ticks += 1
+            while next_tick <= now:
+                for session in self.sessions:
+                    session.tick(dt)
+                    self._flush(session)
+                self.ticks += 1
+                next_tick += dt
+        for session in list(self.sessions):
+            self._close(session)
+        self.selector.close()
+        self.listener.close()
+
+    def _accept(self):
+        """Start a session for a new client"""
+        try:
+            sock, _ = self.listener.accept()
+        except BlockingIOError:
+            return
+        sock.setblocking(False)
+        # small deltas are sent at once instead of waiting to be merged
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session = Session(sock, self.settings)
+        self.sessions.append(session)
+        self.selector.register(sock, selectors.EVENT_READ, session)
+        self._flush(session)
+
+    def _flush(self, session):
+        """Send queued bytes of session, wait for socket to be writable if some are left"""
+        events = selectors.EVENT_READ
+        if session.flush():
+            events |= selectors.EVENT_WRITE
+        if self.selector.get_key(session.sock).events != events:
+            self.selector.modify(session.sock, events, session)
+
+    def _close(self, session):
+        """End session of client that disconnected"""
+        self.selector.unregister(session.sock)
+        session.sock.close()
+        self.sessions.remove(session)
+        for name, value in self._totals([session]).items():
+            self.ended[name] = (max(self.ended[name], value) if name == "largest"
+                                else self.ended[name] + value)
+
+    @staticmethod
+    def _totals(sessions):
+        """Return dictionary with sessions, ticks, bytes, seconds and largest message of sessions"""
+        return {
+            "sessions": len(sessions),
+            "ticks": sum(session.ticks for session in sessions),
+            "bytes_sent": sum(session.bytes_sent for session in sessions),
+            "sim_time": sum(session.sim_time for session in sessions),
+            "delta_time": sum(session.delta_time for session in sessions),
+            "largest": max((session.largest for session in sessions), default=0),
+        }
+
+    def report(self):
+        """Return dictionary with ticks, bytes and CPU time per session tick"""
+        running = self._totals(self.sessions)
+        ended = self.ended
+        ticks = ended["ticks"] + running["ticks"]
+        per_tick = max(ticks, 1)
+        return {
+            "sessions": ended["sessions"] + running["sessions"],
+            "server_ticks": self.ticks,
+            "late_ticks": self.late_ticks,
+            "session_ticks": ticks,
+            "sim_us": (ended["sim_time"] + running["sim_time"]) * 1e6 / per_tick,
+            "delta_us": (ended["delta_time"] + running["delta_time"]) * 1e6 / per_tick,
+            "bytes_per_tick": (ended["bytes_sent"] + running["bytes_sent"]) / per_tick,
+            "largest_message": max(ended["largest"], running["largest"]),
+        }
+
+
+class Client:
+    """A class to mirror a game hosted by Server
+
+    Client never runs game rules. It starts from the snapshot sent when it
+    connects and then applies one delta per server tick. Between deltas it
+    only moves bullets and plays animations, which need no rules.
+    """
+
+    def __init__(self, address, headless=True):
+        """Connect to server at address and build game from its first message"""
+        self.sock = socket.create_connection(address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        join = self._receive_join()
+        settings_size, state_size = _JOIN.unpack_from(join)
+        start = _JOIN.size
+        settings = Settings()
+        settings.load_snapshot(json.loads(join[start:start + settings_size]))
+        start += settings_size
+        # server decides how games end, client does not save them
+        self.game = AlienInvasion(headless=headless, settings=settings, leaderboard=False)
+        snapshot.restore(self.game, join[start:start + state_size])
+        self.dt = 1 / settings.tick_rate
+        self.sock.setblocking(False)
+        # inputs held, number of inputs sent and time every input waiting for its ack was sent
+        self.held = 0
+        self.sequence = 0
+        self.sent_at = {}
+        # deltas applied, bytes received and sent, seconds from input to its ack
+        self.deltas = 0
+        self.bytes_received = len(join) + _LENGTH.size
+        self.bytes_sent = 0
+        self.latencies = []
+        # checksums compared and checksums that did not match
+        self.checks = 0
+        self.mismatches = 0
+
+    def _receive_join(self):
+        """Wait for first message of server and return it"""
+        data = bytearray()
+        while True:
+            chunk = self.sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("server closed connection before game started")
+            data += chunk
+            if len(data) >= _LENGTH.size:
+                (size,) = _LENGTH.unpack_from(data)
+                if len(data) >= _LENGTH.size + size:
+                    # deltas that came with first message are applied by the next poll()
+                    self.pending = data[_LENGTH.size + size:]
+                    return bytes(data[_LENGTH.size:_LENGTH.size + size])
+
+    def send_actions(self, actions):
+        """Send actions named like step() actions, only if they change something"""
+        bits = 0
+        for action in actions:
+            bits |= _ACTION_BITS[action]
+        held = bits & (LEFT | RIGHT)
+        if held == self.held and not bits & (FIRE | PLAY):
+            return
+        self.held = held
+        self.sequence = (self.sequence + 1) & 0xFFFF
+        self.sent_at[self.sequence] = perf_counter()
+        message = _INPUT.pack(self.sequence, bits)
+        # input is tiny, socket buffer is never full unless server stopped reading
+        self.sock.sendall(message)
+        self.bytes_sent += len(message)
+
+    def poll(self):
+        """Apply every delta received so far, return number applied
+
+        Raises ConnectionError once server closed the connection
+        """
+        data = self.pending
+        while True:
+            try:
+                chunk = self.sock.recv(65536)
+            except (BlockingIOError, InterruptedError):
+                break
+            if not chunk:
+                raise ConnectionError("server closed connection")
+            data += chunk
+            self.bytes_received += len(chunk)
+        offset = 0
+        applied = 0
+        while len(data) - offset >= _LENGTH.size:
+            (size,) = _LENGTH.unpack_from(data, offset)
+            end = offset + _LENGTH.size + size
+            if end > len(data):
+                break
+            self._apply(bytes(data[offset + _LENGTH.size:end]))
+            offset = end
+            applied += 1
+        self.pending = data[offset:]
+        self.deltas += applied
+        return applied
+
+    def _apply(self, data):
+        """Change mirrored game the way one server tick changed it"""
+        game = self.game
+        aliens = game.aliens
+        sb = game.sb
+        _, flags = _DELTA.unpack_from(data)
+        offset = _DELTA.size
+        if flags & SPEEDS:
+            (game.settings.bullet_speed,) = _SPEEDS.unpack_from(data, offset)
+            offset += _SPEEDS.size
+        # parts of a tick that follow from what client already knows
+        game.tick_count += 1
+        game.explosions.update(self.dt)
+        if flags & MOVED:
+            game.bullets.move(self.dt)
+            aliens.animate(self.dt)
+        if flags & SPAWN:
+            (level,) = _SPAWN.unpack_from(data, offset)
+            offset += _SPAWN.size
+            # layout of the new fleet depends on level
+            if level != game.stats.level:
+                game.stats.level = level
+                sb.prep_level()
+            game._create_fleet()
+        if flags & (REMOVED | CLEARED):
+            slots, offset = _unpack_numbers(data, offset)
+            aliens.remove_slots(slots, None if flags & CLEARED else game.explosions)
+        if flags & SHIFT:
+            x, y = _SHIFT.unpack_from(data, offset)
+            offset += _SHIFT.size
+            aliens.move(x - aliens.shift_x)
+            aliens.drop(y - aliens.shift_y)
+        if flags & SHIP:
+            (game.ship.rect.x,) = _SHIP.unpack_from(data, offset)
+            game.ship.x = float(game.ship.rect.x)
+            offset += _SHIP.size
+        if flags & BULLETS:
+            removed, offset = _unpack_numbers(data, offset)
+            game.bullets.remove_numbers(removed)
+            (count,) = _COUNT.unpack_from(data, offset)
+            offset += _COUNT.size
+            for _ in range(count):
+                game.bullets.place(*_FIRED.unpack_from(data, offset))
+                offset += _FIRED.size
+        if flags & STATS:
+            stats = game.stats
+            shown = _stats(game)
+            (stats.score, stats.high_score, stats.level, stats.ships_left,
+             stats.game_active) = _STATS.unpack_from(data, offset)
+            offset += _STATS.size
+            # scoreboard images are only made again for values that changed
+            if stats.score != shown[0]:
+                sb.prep_score()
+            if stats.high_score != shown[1]:
+                sb.prep_high_score()
+            if stats.level != shown[2]:
+                sb.prep_level()
+            if stats.ships_left != shown[3]:
+                sb.prep_ships()
+        if flags & ACK:
+            (sequence,) = _SEQUENCE.unpack_from(data, offset)
+            offset += _SEQUENCE.size
+            # inputs merged into the same tick are acked together by the newest one
+            sent_at = self.sent_at.pop(sequence, None)
+            if sent_at is not None:
+                self.latencies.append(perf_counter() - sent_at)
+            for older in [n for n in self.sent_at if (sequence - n) & 0xFFFF < 0x8000]:
+                del self.sent_at[older]
+        if flags & CHECK:
+            (checksum,) = _CHECK.unpack_from(data, offset)
+            self.checks += 1
+            if checksum != _checksum(game):
+                self.mismatches += 1
+        # everything may have moved, dirty render mode has to redraw whole screen
+        game.renderer.full_redraw = True
+
+    def close(self):
+        """Disconnect from server"""
+        self.sock.close()
+
+    def report(self):
+        """Return dictionary with bytes per tick, input latency and checksums"""
+        latencies = sorted(self.latencies)
+        deltas = max(self.deltas, 1)
+        result = {
+            "deltas": self.deltas,
+            "down_bytes_per_tick": self.bytes_received / deltas,
+            "up_bytes_per_tick": self.bytes_sent / deltas,
+            "inputs": len(latencies),
+            "checks": self.checks,
+            "mismatches": self.mismatches,
+        }
+        if latencies:
+            result["latency_mean_ms"] = sum(latencies) * 1000 / len(latencies)
+            result["latency_p50_ms"] = latencies[len(latencies) // 2] * 1000
+            result["latency_p95_ms"] = latencies[int(len(latencies) * 0.95)] * 1000
+        return result
+
+
+def play(address):
+    """Play game hosted by server at address in a window"""
+    client = Client(address, headless=False)
+    game = client.game
+    held = set()
+    # clock caps how often the screen is drawn so one core is not pinned at 100%
+    clock = pygame.time.Clock()
+    while True:
+        clock.tick(game.settings.max_fps)
+        presses = []
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key == pygame.K_q):
+                client.close()
+                game._quit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_RIGHT:
+                held.add("right")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_LEFT:
+                held.add("left")
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                presses.append("fire")
+            elif event.type == pygame.KEYUP and event.key == pygame.K_RIGHT:
+                held.discard("right")
+            elif event.type == pygame.KEYUP and event.key == pygame.K_LEFT:
+                held.discard("left")
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if game.play_button.rect.collidepoint(event.pos) and not game.stats.game_active:
+                    presses.append("play")
+        client.send_actions(list(held) + presses)
+        client.poll()
+        pygame.mouse.set_visible(not game.stats.game_active)
+        game._update_screen()
+
+
+def _serve_until_told(connection, settings):
+    """Server process of loopback(), sends address, serves until told to stop and sends report"""
+    server = Server(settings=settings)
+    connection.send(server.address)
+    server.serve(should_stop=connection.poll)
+    connection.send(server.report())
+
+
+def loopback(clients=4, seconds=5.0, player="sweep", settings=None):
+    """Play clients games with bots against a server process on loopback
+
+    Returns (server report, list of client reports)
+    """
+    settings = settings if settings is not None else Settings()
+    connection, server_end = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve_until_told, args=(server_end, settings),
+                                      name="loopback server", daemon=True)
+    process.start()
+    address = connection.recv()
+    players = [(Client(address), PLAYERS[player](seed=n)) for n in range(clients)]
+    selector = selectors.DefaultSelector()
+    for client, bot in players:
+        selector.register(client.sock, selectors.EVENT_READ, (client, bot))
+    end = perf_counter() + seconds
+    while perf_counter() < end:
+        for key, _ in selector.select(0.1):
+            client, bot = key.data
+            # bot answers every tick like a player watching the screen
+            for _ in range(client.poll()):
+                client.send_actions(bot.act(client.game))
+    for client, _ in players:
+        client.poll()
+        client.close()
+    selector.close()
+    connection.send("stop")
+    server_report = connection.recv()
+    process.join()
+    return server_report, [client.report() for client, _ in players]
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(
+        description="Host games on an authoritative server and play them on thin clients")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve = commands.add_parser("serve", help="host a game for every client that connects")
+    serve.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    serve.add_argument("--port", type=int, default=5555, help="port to listen on")
+    join = commands.add_parser("play", help="play a game hosted by a server in a window")
+    join.add_argument("--host", default="127.0.0.1", help="address of server")
+    join.add_argument("--port", type=int, default=5555, help="port of server")
+    test = commands.add_parser("loopback",
+                               help="let bots play against a local server and report bandwidth")
+    test.add_argument("--clients", type=int, default=8, help="games played at once")
+    test.add_argument("--seconds", type=float, default=5, help="seconds games are played")
+    test.add_argument("--player", choices=sorted(PLAYERS), default="sweep",
+                      help="bot playing the games")
+    test.add_argument("--backend", choices=("sprites", "numpy"), default="sprites",
+                      help="fleet backend of server games")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = Server((args.host, args.port))
+        print(f"serving on {server.address[0]}:{server.address[1]}")
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        print(server.report())
+    elif args.command == "play":
+        play((args.host, args.port))
+    else:
+        settings = Settings()
+        settings.fleet_backend = args.backend
+        server_report, client_reports = loopback(args.clients, args.seconds, args.player, settings)
+        ticks = server_report["session_ticks"]
+        print(f"{server_report['sessions']} sessions, {ticks} session ticks, "
+              f"{server_report['late_ticks']} late server ticks")
+        print(f"server: {server_report['sim_us']:.1f} us rules + "
+              f"{server_report['delta_us']:.1f} us delta per session tick, "
+              f"{server_report['bytes_per_tick']:.1f} bytes per session tick, "
+              f"largest message {server_report['largest_message']} bytes")
+        deltas = sum(report["deltas"] for report in client_reports)
+        down = sum(report["down_bytes_per_tick"] * report["deltas"] for report in client_reports)
+        up = sum(report["up_bytes_per_tick"] * report["deltas"] for report in client_reports)
+        latencies = [report for report in client_reports if report["inputs"]]
+        print(f"clients: {deltas} deltas, {down / max(deltas, 1):.1f} bytes down and "
+              f"{up / max(deltas, 1):.1f} bytes up per tick, "
+              f"{down / max(deltas, 1) * settings.tick_rate / 1024:.2f} KiB/s down per client")
+        if latencies:
+            print(f"input to acked state: mean "
+                  f"{sum(r['latency_mean_ms'] for r in latencies) / len(latencies):.2f} ms, "
+                  f"worst p95 {max(r['latency_p95_ms'] for r in latencies):.2f} ms")
+        checks = sum(report["checks"] for report in client_reports)
+        mismatches = sum(report["mismatches"] for report in client_reports)
+        print(f"{checks} state checksums compared, "
+              f"{'all match' if not mismatches else f'{mismatches} MISMATCHED'}")
@@ -0,0 +1,328 @@
+import argparse  # Tools used to read command line options
+import queue  # Tools used to pass input to the simulation thread
+import threading  # Tools used to run simulation next to drawing
+import time  # Tools used to wait for the next tick
+from time import perf_counter  # Tools used to time ticks and input
+import pygame
+import profiler  # use profiler module
+from renderer import FrameQueue  # use renderer module
+
+
+class Frame:
+    """One frame published by the simulation, drawn later by the main thread"""
+
+    __slots__ = ("queue", "tick", "input_time")
+
+    def __init__(self):
+        """Initialize empty frame"""
+        # everything to draw, positions are copies and queued images are never drawn over,
+        # so the frame never changes once published
+        self.queue = FrameQueue()
+        # simulation tick frame shows
+        self.tick = 0
+        # time oldest input shown for the first time in this frame was read, None if no input
+        self.input_time = None
+
+
+class FrameBuffers:
+    """A class to pass frames from the simulation thread to the main thread
+
+    Frames are allocated once and reused. Simulation fills a free frame and
+    publishes it, main thread takes the newest published frame and keeps it
+    until it takes the next one. With 3 frames there is always a free frame,
+    a published frame that was never taken is simply reused. With 2 frames
+    simulation waits until the main thread takes the published frame, so it
+    runs at most one frame ahead of the screen.
+    """
+
+    def __init__(self, count=3):
+        """Initialize count frames, count is 2 or more"""
+        if count < 2:
+            raise ValueError(f"pipeline needs at least 2 frame buffers, got {count}")
+        self.free = [Frame() for _ in range(count)]
+        # newest frame published and not taken yet, and frame being drawn
+        self.published = None
+        self.drawing = None
+        # number of frames published so far
+        self.publish_count = 0
+        self.closed = False
+        # signalled every time a frame becomes free or buffers are closed
+        self.changed = threading.Condition()
+
+    def acquire(self):
+        """Return free frame to fill, waits for one with 2 frames, None once closed"""
+        with self.changed:
+            while not self.free and not self.closed:
+                self.changed.wait()
+            if self.closed:
+                return None
+            frame = self.free.pop()
+        frame.queue.clear()
+        return frame
+
+    def publish(self, frame):
+        """Make filled frame the newest one"""
+        with self.changed:
+            old = self.published
+            if old is not None:
+                # old frame is never drawn, its input is first shown by the new frame
+                if old.input_time is not None and (frame.input_time is None
+                                                   or old.input_time < frame.input_time):
+                    frame.input_time = old.input_time
+                self.free.append(old)
+            self.published = frame
+            self.publish_count += 1
+            self.changed.notify_all()
+
+    def take(self, after=None, timeout=0.0):
+        """Return newest published frame, None if nothing was published since last call
+
+        If after is a publish_count, waits up to timeout seconds for a frame
+        published after that count. It does not wait while simulation has no
+        free frame to publish into.
+        """
+        with self.changed:
+            if after is not None:
+                end = perf_counter() + timeout
+                while (self.publish_count <= after and self.free and not self.closed
+                       and perf_counter() < end):
+                    self.changed.wait(end - perf_counter())
+            frame = self.published
+            if frame is None:
+                return None
+            # frame drawn before is done with and can be filled again
+            if self.drawing is not None:
+                self.free.append(self.drawing)
+                self.changed.notify()
+            self.drawing = frame
+            self.published = None
+            return frame
+
+    def close(self):
+        """Stop simulation waiting for frames"""
+        with self.changed:
+            self.closed = True
+            self.changed.notify_all()
+
+
+class PipelinedLoop:
+    """Game loop with simulation and drawing on separate threads
+
+    Simulation thread runs fixed ticks on its own clock, applies input passed
+    from the main thread and publishes a frame after every batch of ticks.
+    Main thread reads input, draws the newest frame and flips it, so blits,
+    flip and vsync waits overlap the next ticks instead of delaying them.
+    Game state is only changed by the simulation thread.
+    """
+
+    def __init__(self, ai_game):
+        """Prepare buffers and simulation thread for ai_game"""
+        self.ai_game = ai_game
+        self.settings = ai_game.settings
+        self.buffers = FrameBuffers(self.settings.frame_buffers)
+        # (time read, event) of input waiting for the simulation thread
+        self.inputs = queue.SimpleQueue()
+        self.stopping = threading.Event()
+        # exception that ended simulation thread, raised again on main thread
+        self.error = None
+        self.thread = threading.Thread(target=self._simulate, name="simulation", daemon=True)
+
+    def run(self):
+        """Start simulation thread and draw frames until game quits"""
+        self.thread.start()
+        # clock caps how often the screen is drawn so one core is not pinned at 100%
+        clock = pygame.time.Clock()
+        try:
+            while True:
+                clock.tick(self.settings.max_fps)
+                start = perf_counter()
+                # frames published so far, newer frames may show input read now
+                publish_count = self.buffers.publish_count
+                forwarded = self._check_events()
+                self.ai_game.profiler.lap(profiler.EVENTS, start)
+                if self.error is not None:
+                    raise self.error
+                # after input wait a moment for the frame that shows it instead of drawing an older one
+                if forwarded:
+                    frame = self.buffers.take(publish_count, 2 / self.settings.tick_rate)
+                else:
+                    frame = self.buffers.take()
+                # simulation has not published anything new, screen stays as it is
+                if frame is None:
+                    continue
+                self._draw(frame)
+                self.ai_game.profiler.end_frame()
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop simulation thread and wait for it to finish its tick"""
+        self.stopping.set()
+        self.buffers.close()
+        if self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def _quit(self):
+        """Stop simulation then quit game the usual way"""
+        self.stop()
+        self.ai_game._quit()
+
+    def _check_events(self):
+        """Read input and pass it to the simulation thread, return True if any input was passed"""
+        forwarded = False
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self._quit()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_q:
+                self._quit()
+            # If window was hidden and shown again whole screen has to be redrawn
+            elif event.type == pygame.WINDOWEXPOSED:
+                self.ai_game.renderer.full_redraw = True
+            elif event.type in (pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN):
+                self.inputs.put((perf_counter(), event))
+                forwarded = True
+        return forwarded
+
+    def _draw(self, frame):
+        """Draw frame and make it visible"""
+        game = self.ai_game
+        start = perf_counter()
+        game.renderer.begin_frame()
+        start = game.profiler.lap(profiler.FILL, start)
+        rects = frame.queue.flush(game.screen)
+        start = game.profiler.lap(profiler.DRAW, start)
+        game.renderer.end_frame(rects)
+        game.profiler.lap(profiler.FLIP, start)
+        # overlay shows draws of the frame drawn last
+        game.profiler.queue = frame.queue
+        game.profiler.latency.presented(frame.input_time)
+
+    def _apply_inputs(self, timeout):
+        """Apply input read by main thread, return time oldest input was read or None
+
+        Waits up to timeout seconds for the first input, so input arriving
+        between ticks is applied at once
+        """
+        game = self.ai_game
+        oldest = None
+        while True:
+            try:
+                read_time, event = self.inputs.get(timeout=timeout) if oldest is None \
+                    else self.inputs.get_nowait()
+            except queue.Empty:
+                return oldest
+            if oldest is None:
+                oldest = read_time
+            if event.type == pygame.KEYDOWN:
+                game._check_keydown_events(event)
+            elif event.type == pygame.KEYUP:
+                game._check_keyup_events(event)
+            else:
+                # position of click is taken from event, mouse may have moved since
+                game._check_play_button(event.pos)
+
+    def _simulate(self):
+        """Simulation thread, run fixed ticks and publish a frame after each batch"""
+        game = self.ai_game
+        # length of one simulation tick in seconds
+        dt = 1 / self.settings.tick_rate
+        accumulator = 0.0
+        last = perf_counter()
+        # time oldest applied input not published yet was read
+        input_time = None
+        # seconds until next tick is due, simulation waits for input until then
+        wait = 0.0
+        try:
+            while not self.stopping.is_set():
+                read_time = self._apply_inputs(wait)
+                if input_time is None:
+                    input_time = read_time
+                now = perf_counter()
+                # after a long stall only catch up a limited amount of time
+                accumulator += min(now - last, self.settings.max_frame_time)
+                last = now
+                game._check_leaderboard()
+                ticked = False
+                while accumulator >= dt:
+                    game._update_game(dt)
+                    accumulator -= dt
+                    ticked = True
+                # input can change the screen without a tick, like the overlay key
+                if ticked or input_time is not None:
+                    frame = self.buffers.acquire()
+                    if frame is None:
+                        return
+                    game._enqueue_frame(frame.queue)
+                    frame.tick = game.tick_count
+                    frame.input_time = input_time
+                    input_time = None
+                    self.buffers.publish(frame)
+                wait = max(dt - accumulator - (perf_counter() - last), 0)
+        except BaseException as error:
+            self.error = error
+
+
+def _feed_input(interval, seconds):
+    """Post key presses like a player would, then quit after seconds"""
+    keys = (pygame.K_LEFT, pygame.K_SPACE, pygame.K_RIGHT, pygame.K_SPACE)
+    end = perf_counter() + seconds
+    n = 0
+    while perf_counter() < end:
+        key = keys[n % len(keys)]
+        pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=key))
+        time.sleep(interval / 2)
+        pygame.event.post(pygame.event.Event(pygame.KEYUP, key=key))
+        time.sleep(interval / 2)
+        n += 1
+    pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+
+def _measure(mode, seconds, present_delay, interval):
+    """Play game in mode ("serial", "pipeline-2", "pipeline-3") and return latency summary"""
+    from settings import Settings  # use settings module
+    from alien_invasion import AlienInvasion  # use main game module
+    settings = Settings()
+    settings.pipeline = mode != "serial"
+    if settings.pipeline:
+        settings.frame_buffers = int(mode[-1])
+    # measured games are not saved on the leaderboard
+    game = AlienInvasion(settings=settings, seed=0, leaderboard=False)
+    if present_delay:
+        # stand in for a slow flip or a vsync wait
+        end_frame = game.renderer.end_frame
+
+        def slow_end_frame(rects):
+            end_frame(rects)
+            time.sleep(present_delay)
+        game.renderer.end_frame = slow_end_frame
+    game._start_game()
+    threading.Thread(target=_feed_input, args=(interval, seconds), daemon=True).start()
+    # latency and rates are counted from when the game loop starts
+    game.profiler.latency = profiler.LatencyMeter(game)
+    try:
+        game.Run_Game()
+    except SystemExit:
+        pass
+    return game.profiler.latency.summary()
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(
+        description="Measure input latency and tick rate of serial and pipelined game loops")
+    parser.add_argument("--seconds", type=float, default=5, help="seconds each mode is played")
+    parser.add_argument("--present-delay", type=float, default=0,
+                        help="milliseconds added to every flip, stands in for a slow display")
+    parser.add_argument("--input-interval", type=float, default=100,
+                        help="milliseconds between key presses")
+    parser.add_argument("--modes", nargs="+", default=["serial", "pipeline-2", "pipeline-3"],
+                        choices=["serial", "pipeline-2", "pipeline-3"], help="loops measured")
+    args = parser.parse_args()
+    print(f"{'mode':<12}{'ticks/s':>9}{'fps':>7}{'inputs':>8}"
+          f"{'mean ms':>9}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}")
+    for mode in args.modes:
+        result = _measure(mode, args.seconds, args.present_delay / 1000,
+                          args.input_interval / 1000)
+        print(f"{mode:<12}{result['ticks_per_second']:9.1f}{result['frames_per_second']:7.1f}"
+              f"{result['inputs']:8d}{result.get('latency_mean_ms', 0):9.2f}"
+              f"{result.get('latency_p50_ms', 0):8.2f}{result.get('latency_p95_ms', 0):8.2f}"
+              f"{result.get('latency_max_ms', 0):8.2f}")
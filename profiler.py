@@ -0,0 +1,208 @@
+import csv  # Tools used to write timings to CSV
+from array import array  # Tools used to store timings without creating objects
+from time import perf_counter  # Tools used to time phases
+from renderer import HUD  # use renderer module
+
+# phases of a frame, each one is an index into the timings of the frame
+# sprites and score queue images, draw is the time spent drawing the render queue
+EVENTS, SHIP, BULLETS, COLLISIONS, ALIENS, FILL, SPRITES, SCORE, DRAW, FLIP = range(10)
+PHASE_NAMES = ("events", "ship", "bullets", "collisions", "aliens",
+               "fill", "sprites", "score", "draw", "flip")
+
+
+class FrameProfiler:
+    """A class to time each phase of every frame
+
+    Timings of the last frames are kept in a ring buffer of floats that is
+    allocated once. Average timings can be shown next to the scoreboard and
+    all kept frames can be written to a CSV file.
+    """
+
+    def __init__(self, ai_game, frames=600):
+        """Initialize ring buffer for frames frames"""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.assets = ai_game.assets
+        # render queue counts draws of every frame
+        self.queue = ai_game.renderer.queue
+        self.frames = frames
+        # timings of phases in current frame, seconds
+        self.current = [0.0] * len(PHASE_NAMES)
+        # timings of last frames, one row of phases per frame
+        self.ring = array("d", bytes(8 * frames * len(PHASE_NAMES)))
+        # number of frames recorded so far
+        self.count = 0
+
+        # overlay with average timings, F3 shows or hides it
+        self.show_overlay = False
+        self.text_color = (30, 30, 30)
+        # font is only made when overlay is first shown
+        self.font = None
+        self.overlay_images = []
+        # overlay text is rendered again a few times per second, not every frame
+        self.overlay_interval = 15
+        # input latency and simulation tick rate, shown on overlay
+        self.latency = LatencyMeter(ai_game)
+
+    def lap(self, phase, start):
+        """Add time since start to phase and return current time for next lap"""
+        now = perf_counter()
+        self.current[phase] += now - start
+        return now
+
+    def end_frame(self):
+        """Store timings of current frame in ring buffer and start a new frame"""
+        offset = (self.count % self.frames) * len(PHASE_NAMES)
+        current = self.current
+        for phase in range(len(PHASE_NAMES)):
+            self.ring[offset + phase] = current[phase]
+            current[phase] = 0.0
+        self.count += 1
+        if self.show_overlay and self.count % self.overlay_interval == 0:
+            self.prep_overlay()
+
+    def _rows(self):
+        """Return rows of timings from oldest to newest frame"""
+        size = len(PHASE_NAMES)
+        kept = min(self.count, self.frames)
+        first = self.count - kept
+        for frame in range(first, self.count):
+            offset = (frame % self.frames) * size
+            yield self.ring[offset:offset + size]
+
+    def averages(self):
+        """Return average milliseconds of every phase over kept frames"""
+        totals = [0.0] * len(PHASE_NAMES)
+        kept = 0
+        for row in self._rows():
+            kept += 1
+            for phase, seconds in enumerate(row):
+                totals[phase] += seconds
+        return [total * 1000 / max(kept, 1) for total in totals]
+
+    def toggle_overlay(self):
+        """Show overlay if hidden and hide it if shown"""
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.prep_overlay()
+
+    def prep_overlay(self):
+        """Turn average timings into rendered images"""
+        if self.font is None:
+            self.font = self.assets.get_font(24)
+        averages = self.averages()
+        lines = [f"{name}: {ms:.2f} ms" for name, ms in zip(PHASE_NAMES, averages)]
+        lines.append(f"frame: {sum(averages):.2f} ms")
+        lines.append(f"draws: {self.queue.blit_count} blits, {self.queue.fill_count} fills "
+                     f"in {self.queue.call_count} calls")
+        lines.append(self.latency.line())
+        self.overlay_images = [self.font.render(line, True, self.text_color,
+                                                self.settings.bg_color)
+                               for line in lines]
+
+    def enqueue_overlay(self, queue):
+        """Add overlay below ships left on scoreboard to render queue"""
+        if not self.show_overlay:
+            return
+        top = 70
+        for image in self.overlay_images:
+            queue.blit(HUD, image, (10, top))
+            top += image.get_height()
+
+    def dump_csv(self, path):
+        """Write timings of kept frames to CSV file in milliseconds"""
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(PHASE_NAMES + ("frame",))
+            for row in self._rows():
+                ms = [seconds * 1000 for seconds in row]
+                writer.writerow([f"{value:.4f}" for value in ms + [sum(ms)]])
+
+
+class LatencyMeter:
+    """A class to measure input latency and simulation tick rate
+
+    Input latency is the time from the game reading an input to the end of
+    presenting the first frame that shows it. Latencies of the last inputs
+    are kept in a ring buffer that is allocated once.
+    """
+
+    def __init__(self, ai_game, samples=256):
+        """Initialize ring buffer for samples latencies"""
+        self.ai_game = ai_game
+        self.samples = samples
+        self.ring = array("d", bytes(8 * samples))
+        # number of latencies recorded so far
+        self.count = 0
+        # frames presented, ticks and time counted from here
+        self.frames = 0
+        self.start_time = perf_counter()
+        self.start_tick = ai_game.tick_count
+
+    def presented(self, input_time):
+        """Count a presented frame, input_time is when its oldest new input was read or None"""
+        self.frames += 1
+        if input_time is not None:
+            self.ring[self.count % self.samples] = perf_counter() - input_time
+            self.count += 1
+
+    def summary(self):
+        """Return dictionary of input latency in milliseconds, ticks and frames per second"""
+        elapsed = max(perf_counter() - self.start_time, 1e-9)
+        latencies = sorted(self.ring[:min(self.count, self.samples)])
+        summary = {"inputs": self.count,
+                   "ticks_per_second": (self.ai_game.tick_count - self.start_tick) / elapsed,
+                   "frames_per_second": self.frames / elapsed}
+        if latencies:
+            summary.update(
+                latency_mean_ms=sum(latencies) * 1000 / len(latencies),
+                latency_p50_ms=latencies[len(latencies) // 2] * 1000,
+                latency_p95_ms=latencies[min(len(latencies) * 95 // 100, len(latencies) - 1)] * 1000,
+                latency_max_ms=latencies[-1] * 1000)
+        return summary
+
+    def line(self):
+        """Return one line of text with average latency and rates for the overlay"""
+        summary = self.summary()
+        return (f"input: {summary.get('latency_mean_ms', 0):.1f} ms, "
+                f"sim: {summary['ticks_per_second']:.0f} ticks/s, "
+                f"{summary['frames_per_second']:.0f} fps")
+
+    def report(self):
+        """Return text with input latency percentiles, tick rate and frame rate"""
+        summary = self.summary()
+        lines = [f"{'ticks/s':<16}{summary['ticks_per_second']:8.1f}",
+                 f"{'frames/s':<16}{summary['frames_per_second']:8.1f}",
+                 f"{'inputs':<16}{summary['inputs']:8d}"]
+        for name in ("mean", "p50", "p95", "max"):
+            value = summary.get(f"latency_{name}_ms")
+            if value is not None:
+                lines.append(f"{'latency ' + name:<16}{value:8.2f} ms")
+        return "\n".join(lines)
+
+
+class StartupTimer:
+    """A class to time each step of game startup"""
+
+    def __init__(self):
+        """Start timing"""
+        self.start = perf_counter()
+        self.last = self.start
+        # name and seconds of every step in order
+        self.steps = []
+
+    def mark(self, name):
+        """End step name, the next step starts now"""
+        now = perf_counter()
+        self.steps.append((name, now - self.last))
+        self.last = now
+
+    def total(self):
+        """Return seconds from start to last step"""
+        return self.last - self.start
+
+    def report(self):
+        """Return text with milliseconds of every step and the total"""
+        lines = [f"{name:<16}{seconds * 1000:8.2f} ms" for name, seconds in self.steps]
+        lines.append(f"{'total':<16}{self.total() * 1000:8.2f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,144 @@
+import pygame
+
+# layers of the render queue, lower layers are drawn first
+# sprites are ship, bullets and aliens, hud is scoreboard and frame timings
+# and ui is the play button drawn on top of everything
+SPRITES, HUD, UI = range(3)
+
+
+class Renderer:
+    """A class to clear the screen and push finished frames to the display
+
+    In "full" render mode the whole screen is filled and flipped every frame.
+    In "dirty" render mode only the areas drawn in the last frame are cleared
+    and only areas drawn in the last and current frame are sent to the display.
+    """
+
+    def __init__(self, ai_game):
+        """Initialize renderer for game screen"""
+        self.screen = ai_game.screen
+        self.settings = ai_game.settings
+        self.dirty = self.settings.render_mode == "dirty"
+        # rects drawn last frame, cleared at start of next frame
+        self.last_rects = []
+        # whole screen has to be drawn on first frame and after window is exposed
+        self.full_redraw = True
+        # everything drawn in a frame is collected here and drawn with queue.flush()
+        self.queue = RenderQueue()
+        # capture.FrameCapture that gets a copy of every presented frame, None when not capturing
+        self.capture = None
+
+    def begin_frame(self):
+        """Clear screen, or only clear what was drawn last frame in dirty mode"""
+        if not self.dirty or self.full_redraw:
+            # fill() fills whole screen with background color
+            self.screen.fill(self.settings.bg_color)
+        else:
+            # clear old position of everything drawn last frame
+            for rect in self.last_rects:
+                self.screen.fill(self.settings.bg_color, rect)
+
+    def end_frame(self, rects):
+        """Make frame visible, rects are the areas drawn this frame"""
+        if not self.dirty or self.full_redraw:
+            # Make most recent drawn screen visible
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            # only send areas that were cleared or drawn to the display
+            pygame.display.update(self.last_rects + rects)
+        self.last_rects = rects
+        # screen holds the whole frame in both render modes
+        if self.capture is not None:
+            self.capture.grab(self.screen)
+
+
+class RenderQueue:
+    """A class to collect everything drawn in a frame and draw it in few calls
+
+    Images and filled rects are added to a layer. flush() draws layers in
+    order, every run of images between fills is drawn with one Surface.blits()
+    call, so the cost per image is small even with hundreds of aliens.
+    """
+
+    def __init__(self):
+        """Initialize empty queue"""
+        # (image, position) and (color, rect) pairs of every layer
+        self.blits = [[] for _ in range(UI + 1)]
+        self.fills = [[] for _ in range(UI + 1)]
+        # counts of last flush, shown by frame profiler
+        self.blit_count = 0
+        self.fill_count = 0
+        self.call_count = 0
+
+    def blit(self, layer, image, position):
+        """Add image drawn at position to layer"""
+        self.blits[layer].append((image, position))
+
+    def extend(self, layer, items):
+        """Add (image, position) pairs to layer"""
+        self.blits[layer].extend(items)
+
+    def fill(self, layer, color, rect):
+        """Add rect filled with color to layer, fills of a layer are drawn before its images"""
+        self.fills[layer].append((color, rect))
+
+    def flush(self, surface):
+        """Draw everything in queue onto surface, empty queue and return areas drawn"""
+        rects = []
+        # images of layers without fills are joined into one blits() call
+        batch = []
+        blit_count = fill_count = calls = 0
+        for layer in range(UI + 1):
+            fills = self.fills[layer]
+            if fills:
+                # images of lower layers have to be drawn before these fills
+                if batch:
+                    rects.extend(surface.blits(batch))
+                    calls += 1
+                    blit_count += len(batch)
+                    batch = []
+                for color, rect in fills:
+                    rects.append(surface.fill(color, rect))
+                calls += len(fills)
+                fill_count += len(fills)
+                fills.clear()
+            batch.extend(self.blits[layer])
+            self.blits[layer].clear()
+        if batch:
+            rects.extend(surface.blits(batch))
+            calls += 1
+            blit_count += len(batch)
+        self.blit_count = blit_count
+        self.fill_count = fill_count
+        self.call_count = calls
+        return rects
+
+
+class FrameQueue(RenderQueue):
+    """Render queue that can be filled on one thread and drawn on another
+
+    Positions are copied as (x, y) pairs and fill rects as new rects when they
+    are queued, so the simulation can keep moving sprites while the queued
+    frame is drawn. Images are not copied, images that change are replaced by
+    new surfaces instead of being drawn over (see text.TextImage).
+    """
+
+    def blit(self, layer, image, position):
+        """Add image drawn at copy of position to layer"""
+        self.blits[layer].append((image, (position[0], position[1])))
+
+    def extend(self, layer, items):
+        """Add (image, position) pairs to layer, positions are copied"""
+        self.blits[layer].extend([(image, (position[0], position[1]))
+                                  for image, position in items])
+
+    def fill(self, layer, color, rect):
+        """Add copy of rect filled with color to layer"""
+        self.fills[layer].append((color, pygame.Rect(rect)))
+
+    def clear(self):
+        """Empty queue without drawing it"""
+        for layer in range(UI + 1):
+            self.blits[layer].clear()
+            self.fills[layer].clear()
@@ -0,0 +1,139 @@
+import argparse  # Tools used to read command line options
+import gzip  # Tools used to compress session logs
+import json  # Tools used to save session logs
+import os  # Tools used to count processor cores
+import sys  # Tools used to exit replay when player quits
+import pygame
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion  # use main game module
+
+# version of the session log format
+LOG_VERSION = 1
+
+
+class Recorder:
+    """A class to record player input of a session so it can be replayed
+
+    Log holds the seed, a snapshot of Settings and every key press, key release
+    and mouse click together with the simulation tick it was applied before
+    """
+
+    def __init__(self, path):
+        """Initialize recorder that saves log to path"""
+        self.path = path
+        self.seed = None
+        self.settings = None
+        # every event is a list of tick, event type, key or mouse x, mouse y
+        self.events = []
+
+    def start(self, ai_game):
+        """Remember seed and starting settings of game"""
+        self.seed = ai_game.seed
+        self.settings = ai_game.settings.snapshot()
+
+    def record(self, tick, event_type, *values):
+        """Record an input event applied before simulation tick"""
+        self.events.append([tick, event_type, *values])
+
+    def save(self, ai_game):
+        """Save compressed log of the session"""
+        log = {"version": LOG_VERSION, "seed": self.seed,
+               "settings": self.settings, "ticks": ai_game.tick_count,
+               "events": self.events}
+        with gzip.open(self.path, "wt") as file:
+            json.dump(log, file, separators=(",", ":"))
+
+
+def load_log(path):
+    """Load session log saved by Recorder"""
+    with gzip.open(path, "rt") as file:
+        log = json.load(file)
+    if log["version"] != LOG_VERSION:
+        raise ValueError(f"unsupported session log version {log['version']}")
+    return log
+
+
+def _apply_event(ai_game, event_type, *values):
+    """Send recorded input to the game the same way _check_events does"""
+    if event_type == pygame.KEYDOWN:
+        ai_game._check_keydown_events(pygame.event.Event(event_type, key=values[0]))
+    elif event_type == pygame.KEYUP:
+        ai_game._check_keyup_events(pygame.event.Event(event_type, key=values[0]))
+    elif event_type == pygame.MOUSEBUTTONDOWN:
+        ai_game._check_play_button(values)
+
+
+def replay(log, realtime=False, ai_game=None, capture=None, capture_format="png",
+           capture_writers=1):
+    """Replay session log and return the game in its final state
+
+    realtime=True shows the replay in a window at normal speed, otherwise the
+    replay runs headless as fast as possible. A game made by the caller can be
+    passed as ai_game, it must use the seed and settings of the log.
+    capture is a path frames are saved to in capture_format (see capture.py),
+    headless replays are then drawn too and wait for the writer instead of
+    dropping frames. capture_writers PNG writer processes run at once.
+    """
+    if ai_game is None:
+        settings = Settings()
+        settings.load_snapshot(log["settings"])
+        # replayed games were saved when they were played
+        ai_game = AlienInvasion(headless=not realtime, settings=settings,
+                                seed=log["seed"], leaderboard=False)
+    dt = 1 / ai_game.settings.tick_rate
+    # show a frame every few ticks when replaying in real time
+    ticks_per_frame = max(1, round(ai_game.settings.tick_rate / ai_game.settings.max_fps))
+    clock = pygame.time.Clock()
+    if capture is not None:
+        from capture import FrameCapture  # use capture module
+        ai_game.renderer.capture = FrameCapture(
+            ai_game, capture, capture_format,
+            fps=ai_game.settings.tick_rate / ticks_per_frame, wait=not realtime,
+            writers=capture_writers)
+    # frames are drawn when they are shown or saved
+    draw = realtime or capture is not None
+    events = log["events"]
+    next_event = 0
+    try:
+        for tick in range(log["ticks"]):
+            # apply input recorded before this tick
+            while next_event < len(events) and events[next_event][0] <= tick:
+                _apply_event(ai_game, *events[next_event][1:])
+                next_event += 1
+            ai_game._update_game(dt)
+            if draw and tick % ticks_per_frame == 0:
+                if realtime:
+                    # window can still be closed while replay is shown
+                    for event in pygame.event.get():
+                        if event.type == pygame.QUIT:
+                            sys.exit()
+                ai_game._update_screen()
+                if realtime:
+                    clock.tick(ai_game.settings.tick_rate / ticks_per_frame)
+    except SystemExit:
+        # recorded session ended with the player quitting
+        pass
+    finally:
+        if ai_game.renderer.capture is not None:
+            ai_game.renderer.capture.close()
+    return ai_game
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(description="Replay a recorded Alien Invasion session")
+    parser.add_argument("log", help="session log saved with alien_invasion.py --record")
+    parser.add_argument("--realtime", action="store_true",
+                        help="show replay in a window at normal speed")
+    parser.add_argument("--capture", metavar="PATH", help="save replay frames to PATH")
+    parser.add_argument("--capture-format", choices=("png", "raw", "ffmpeg"), default="png",
+                        help="PNG images in folder PATH, raw rgb24 file or video made by ffmpeg")
+    parser.add_argument("--capture-writers", type=int, default=os.cpu_count() or 1,
+                        help="processes writing PNG images at once")
+    args = parser.parse_args()
+    session = load_log(args.log)
+    game = replay(session, realtime=args.realtime, capture=args.capture,
+                  capture_format=args.capture_format, capture_writers=args.capture_writers)
+    print(f"ticks: {game.tick_count} score: {game.stats.score} "
+          f"level: {game.stats.level} ships left: {game.stats.ships_left}")
+    if game.renderer.capture is not None:
+        print(game.renderer.capture.report())
@@ -1,6 +1,7 @@
-import pygame.font
 from pygame.sprite import Group
 from ship import Ship
+from text import glyph_cache, TextImage
+from renderer import HUD
 
 
 class Scoreboard:
@@ -18,8 +19,17 @@ class Scoreboard:
 
         # font settings for scoring information
         self.text_color = (30, 30, 30)
-        # None - sets default font at size 48
-        self.font = pygame.font.SysFont(None, 48)
+        # default font at size 48, shared with play button
+        self.font = ai_game.assets.get_font(48)
+        # digits and commas are rendered once and score images are built from them
+        glyphs = glyph_cache(ai_game.assets, self.font, self.text_color, self.settings.bg_color)
+        self.score_text = TextImage(glyphs)
+        self.high_score_text = TextImage(glyphs)
+        self.level_text = TextImage(glyphs)
+
+        # ship icons are created once and reused every time ships left changes
+        self.ship_icons = []
+        self.ships = Group()
 
         # prepare initial score image
         self.prep_score()
@@ -38,8 +48,8 @@ class Scoreboard:
         # turn score into string value, string formatting insert commas to score
         score_str = "{:,}".format(rounded_score)
         # create image of score and display on main screen
-        self.score_image = self.font.render(score_str, True,
-                                            self.text_color, self.settings.bg_color)
+        # only digits that changed are drawn again
+        self.score_image = self.score_text.set_text(score_str)
         # Display score at top right of screen
         self.score_rect = self.score_image.get_rect()
         # move score position at up right of screen
@@ -48,17 +58,17 @@ class Scoreboard:
         self.score_rect.top = 20
 
     # display score image
-    def show_score(self):
-        """Draw score, ships and levels to screen"""
+    def enqueue(self, queue):
+        """Add score, ships and levels to render queue"""
         # draw message onto screen at location score_rect
         # draw current score top right
-        self.screen.blit(self.score_image, self.score_rect)
+        queue.blit(HUD, self.score_image, self.score_rect)
         # draw high score top center
-        self.screen.blit(self.high_score_image, self.high_score_rect)
+        queue.blit(HUD, self.high_score_image, self.high_score_rect)
         # draw level count onto screen
-        self.screen.blit(self.level_image, self.level_rect)
+        queue.blit(HUD, self.level_image, self.level_rect)
         # draw ships left on screen
-        self.ships.draw(self.screen)
+        queue.extend(HUD, [(ship.image, ship.rect) for ship in self.ships])
 
     def prep_high_score(self):
         """Turn high score into rendered image"""
@@ -66,9 +76,8 @@ class Scoreboard:
         high_score = round(self.stats.high_score, -1)
         # format high score with commas
         high_score_str = "{:,}".format(high_score)
-        # generate high score image
-        self.high_score_image = self.font.render(high_score_str, True,
-                                                 self.text_color, self.settings.bg_color)
+        # generate high score image from cached glyphs
+        self.high_score_image = self.high_score_text.set_text(high_score_str)
 
         # center high score at top of screen
         self.high_score_rect = self.high_score_image.get_rect()
@@ -83,13 +92,12 @@ class Scoreboard:
             # set current score to high score
             self.stats.high_score = self.stats.score
             # update high score image
-            self.prep_score()
+            self.prep_high_score()
 
     def prep_level(self):
         """Turn level count into rendered image"""
         level_str = str(self.stats.level)
-        self.level_image = self.font.render(level_str, True,
-                                          self.text_color, self.settings.bg_color)
+        self.level_image = self.level_text.set_text(level_str)
 
         # position level count below score
         self.level_rect = self.level_image.get_rect()
@@ -100,15 +108,15 @@ class Scoreboard:
 
     def prep_ships(self):
         """Show how many ships are left"""
-        # create an empty group of ships to hold ships
-        self.ships = Group()
-        # for every ship that is left/available
-        for ship_number in range(self.stats.ships_left):
+        # only create ship icons that were never needed before
+        for ship_number in range(len(self.ship_icons), self.stats.ships_left):
             # create a new ship
             ship = Ship(self.ai_game)
             # set x coordinate so ship is 10 pixels left of the each ship
             ship.rect.x = 10 + ship_number * ship.rect.width
             # set y coordinate 10 pixels down from the top
             ship.rect.y = 10
-            # add each new ship to group
-            self.ships.add(ship)
+            self.ship_icons.append(ship)
+        # group holds one icon for every ship that is left/available
+        self.ships.empty()
+        self.ships.add(self.ship_icons[:self.stats.ships_left])
@@ -8,20 +8,57 @@ class Settings:
         self.screen_height = 600
         # RGB Color
         self.bg_color = (230, 230, 230)
+        # "full" redraws and flips whole screen every frame
+        # "dirty" only clears and updates areas that changed, faster on software rendering
+        self.render_mode = "full"
+        # file frame timings are saved to when F4 is pressed
+        self.profile_path = "profile.csv"
+        # file scores of finished games are kept in, one leaderboard per settings profile
+        self.leaderboard_path = "scores.db"
+        # Timing settings
+        # seconds game pauses after ship is hit and between levels
+        self.ship_hit_pause = 0.5
+        self.level_pause = 0.0
+        # True ends pauses at once, used by simulated runs that do not need them
+        self.skip_pauses = False
+        # simulation runs a fixed number of ticks per second on every machine
+        self.tick_rate = 120
+        # screen is redrawn at most this many times per second
+        self.max_fps = 60
+        # longest frame (seconds) the simulation catches up on after a stall
+        self.max_frame_time = 0.25
+        # True runs simulation on its own thread, main thread only reads input and draws
+        # published frames, so a slow flip or vsync wait does not hold up the simulation
+        self.pipeline = False
+        # frames simulation and drawing pass between them in pipeline mode
+        # 3 never makes simulation wait, 2 lets it run at most one frame ahead of the screen
+        self.frame_buffers = 3
+        # All speeds are in pixels per second
         # Ship settings
-        self.ship_speed = 1.5
+        self.ship_speed = 360.0
         self.ship_limit = 3
         # Bullet settings
-        self.bullet_speed = 1.5
+        self.bullet_speed = 720.0
         self.bullet_width = 3
         self.bullet_height = 15
         self.bullet_color = (60, 60, 60)
         self.bullets_allowed = 3
         # Alien settings
-        self.alien_speed = 1.0
+        self.alien_speed = 240.0
+        # pixels fleet drops every time it changes direction
         self.fleet_drop_speed = 10
         # fleet direction of 1 is right, -1 is left
         self.fleet_direction = 1
+        # "sprites" keeps one Alien sprite per alien
+        # "numpy" stores the fleet in NumPy arrays, faster for large fleets
+        self.fleet_backend = "sprites"
+        # names of wave formations from waves.WAVES, level 1 uses the first one
+        # and later levels take turns through the list
+        self.waves = ("grid",)
+        # seconds each walk frame of the fleet is shown
+        self.alien_frame_time = 0.4
+        # seconds a shot alien explodes for
+        self.explosion_time = 0.3
         # How quickly game speeds up
         self.speedup_scale = 1.1
         # How quickly alien point value increases, rate of increase
@@ -32,15 +69,27 @@ class Settings:
     # initialize values that need to change throughout the game
     def initialize_dynamic_settings(self):
         """Initialize settings that change throughout the game"""
-        self.ship_speed = 1.5
-        self.bullet_speed = 3.0
-        self.alien_speed = 1.0
+        # speeds in pixels per second
+        self.ship_speed = 360.0
+        self.bullet_speed = 720.0
+        self.alien_speed = 240.0
 
         # fleet_direction of 1 represent right, -1 represent left
         self.fleet_direction = 1
         # scoring of each alien
         self.alien_points = 50
 
+    def snapshot(self):
+        """Return copy of every setting as a dictionary that can be saved as JSON"""
+        return {name: list(value) if isinstance(value, tuple) else value
+                for name, value in vars(self).items()}
+
+    def load_snapshot(self, snapshot):
+        """Set every setting from a dictionary made by snapshot()"""
+        for name, value in snapshot.items():
+            # JSON stores colors as lists, settings use tuples
+            setattr(self, name, tuple(value) if isinstance(value, list) else value)
+
     def increase_speed(self):
         """Increase speed settings and alien point values"""
         # increase game speed using speed up scale
@@ -1,5 +1,5 @@
-import pygame
 from pygame.sprite import Sprite
+from renderer import SPRITES  # use renderer module
 
 
 # ship is treated as a rectangle shape and inherits Sprite
@@ -18,8 +18,9 @@ class Ship(Sprite):
         # get screen rect attribute to place ship in correct location on the screen
         # get_rect() can help movement of the ship to a position
         self.screen_rect = ai_game.screen.get_rect()
-        # Load the ship image and get its rect, image.load() returns a surface
-        self.image = pygame.image.load("Images/ship.bmp")
+        # Get the shared ship image from asset cache and get its rect
+        # image is loaded from disk once and reused by every ship
+        self.image = ai_game.assets.get_image("Images/ship.bmp")
         # Access ship surface rect attribute to place the ship
         self.rect = self.image.get_rect()
         # Start each ship at bottom center of the screen
@@ -28,32 +29,38 @@ class Ship(Sprite):
         self.rect.midbottom = self.screen_rect.midbottom
         # Store decimal value for ship's horizontal x position
         self.x = float(self.rect.x)
+        # left edge of ship before its last move
+        self.last_left = self.rect.x
         # Movement flag
         # if ship is moving rightwards
         self.moving_right = False
         # if ship is moving leftwards
         self.moving_left = False
 
-    def update(self):
-        """Update ship position based on movement flag"""
+    def update(self, dt):
+        """Update ship position based on movement flag and elapsed time dt"""
+        # where ship was before this tick, collisions check everything between
+        self.last_left = self.rect.x
         # Update ship x value not rect
-        # Ship speed can be adjusted
+        # Ship speed is in pixels per second so distance moved is speed * dt
         # if moving right is true and right x coordinate of ship < screen right x coordinate
         if self.moving_right and self.rect.right < self.screen_rect.right:
-            self.x += self.settings.ship_speed
+            self.x += self.settings.ship_speed * dt
         # if moving left is true and left x coordinate of ship > 0
         if self.moving_left and self.rect.left > 0:
-            self.x -= self.settings.ship_speed
+            self.x -= self.settings.ship_speed * dt
         # Update rect object from self.x
         self.rect.x = self.x
 
     # Draw image to screen at specified position from self.rect
-    def blitme(self):
-        """Draw the ship in its current location"""
-        self.screen.blit(self.image, self.rect)
+    def enqueue(self, queue):
+        """Add ship in its current location to render queue"""
+        queue.blit(SPRITES, self.image, self.rect)
 
     def center_ship(self):
         """Center ship on screen"""
         self.rect.midbottom = self.screen_rect.midbottom
         # ship centered back to original position
         self.x = float(self.rect.x)
+        # ship jumped to center, it did not travel there
+        self.last_left = self.rect.x
@@ -0,0 +1,230 @@
+import argparse  # Tools used to read command line options
+import struct  # Tools used to pack game state into bytes
+from time import perf_counter  # Tools used to time snapshots
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion, PLAYING, SHIP_HIT, LEVEL_UP  # use main game module
+from bot import PLAYERS  # use bot module
+
+# version of the snapshot format
+SNAPSHOT_VERSION = 2
+# game states in the order they are numbered in snapshots
+_STATES = (PLAYING, SHIP_HIT, LEVEL_UP)
+
+# fixed part of a snapshot, numbers are in native byte order with standard sizes
+# version, tick, state, state timer,
+# score, high score, level, ships left, game active,
+# ship speed, bullet speed, alien speed, fleet direction, alien points,
+# ship x, ship rect x, ship left before last move, moving left, moving right,
+# fleet animation clock, explosion clock,
+# number of aliens, bullets and explosions packed after the header
+_HEADER = struct.Struct("=HQBd qqIi? dddbq dii?? dd III")
+# bytes used by one alien (int32 slot, float64 x and y), bullet (int64 number, 3 float64)
+# and explosion (4 float64), bullets start with int64 count of bullets fired
+_ALIEN_SIZE = 20
+_BULLET_SIZE = 32
+_FIRED_SIZE = 8
+_EXPLOSION_SIZE = 32
+
+
+def take(ai_game):
+    """Return snapshot of the whole simulation state of ai_game as bytes
+
+    Snapshot holds game stats, dynamic settings, ship, bullets, aliens and
+    explosions. Static settings are not included, a snapshot is restored
+    into a game made with the same settings.
+    """
+    settings = ai_game.settings
+    stats = ai_game.stats
+    ship = ai_game.ship
+    aliens = ai_game.aliens.pack_state()
+    bullets = ai_game.bullets.pack_state()
+    explosions = ai_game.explosions.pack_state()
+    header = _HEADER.pack(
+        SNAPSHOT_VERSION, ai_game.tick_count, _STATES.index(ai_game.state), ai_game.state_timer,
+        stats.score, stats.high_score, stats.level, stats.ships_left, stats.game_active,
+        settings.ship_speed, settings.bullet_speed, settings.alien_speed,
+        settings.fleet_direction, settings.alien_points,
+        ship.x, ship.rect.x, ship.last_left, ship.moving_left, ship.moving_right,
+        ai_game.aliens.anim_time, ai_game.explosions.time,
+        len(aliens) // _ALIEN_SIZE, (len(bullets) - _FIRED_SIZE) // _BULLET_SIZE,
+        len(explosions) // _EXPLOSION_SIZE)
+    return b"".join((header, aliens, bullets, explosions))
+
+
+def restore(ai_game, snapshot):
+    """Set ai_game to the state saved in snapshot by take()"""
+    (version, tick_count, state, state_timer,
+     score, high_score, level, ships_left, game_active,
+     ship_speed, bullet_speed, alien_speed, fleet_direction, alien_points,
+     ship_x, ship_rect_x, last_left, moving_left, moving_right,
+     anim_time, explosion_time,
+     num_aliens, num_bullets, num_explosions) = _HEADER.unpack_from(snapshot)
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"unsupported snapshot version {version}")
+    settings = ai_game.settings
+    stats = ai_game.stats
+    ship = ai_game.ship
+    # scoreboard images are only made again for values that changed
+    shown = (stats.score, stats.high_score, stats.level, stats.ships_left)
+
+    ai_game.tick_count = tick_count
+    ai_game.state = _STATES[state]
+    ai_game.state_timer = state_timer
+    stats.score = score
+    stats.high_score = high_score
+    stats.level = level
+    stats.ships_left = ships_left
+    stats.game_active = game_active
+    settings.ship_speed = ship_speed
+    settings.bullet_speed = bullet_speed
+    settings.alien_speed = alien_speed
+    settings.fleet_direction = fleet_direction
+    settings.alien_points = alien_points
+    ship.x = ship_x
+    ship.rect.x = ship_rect_x
+    ship.last_left = last_left
+    ship.moving_left = moving_left
+    ship.moving_right = moving_right
+
+    # aliens, bullets and explosions follow the header in that order
+    start = _HEADER.size
+    end = start + num_aliens * _ALIEN_SIZE
+    # layout depends on level so it is looked up after stats are restored
+    ai_game.aliens.unpack_state(ai_game._fleet_layout(), snapshot[start:end])
+    ai_game.aliens.anim_time = anim_time
+    start, end = end, end + _FIRED_SIZE + num_bullets * _BULLET_SIZE
+    ai_game.bullets.unpack_state(snapshot[start:end])
+    start, end = end, end + num_explosions * _EXPLOSION_SIZE
+    ai_game.explosions.unpack_state(snapshot[start:end], explosion_time)
+
+    sb = ai_game.sb
+    if score != shown[0]:
+        sb.prep_score()
+    if high_score != shown[1]:
+        sb.prep_high_score()
+    if level != shown[2]:
+        sb.prep_level()
+    if ships_left != shown[3]:
+        sb.prep_ships()
+    # everything may have moved, dirty render mode has to redraw whole screen
+    ai_game.renderer.full_redraw = True
+
+
+def fork(ai_game, count, snapshot=None):
+    """Return count headless games that continue from snapshot
+
+    Snapshot defaults to the current state of ai_game. Every game gets its own
+    copy of the settings of ai_game and can be restored again with restore()
+    to branch from the same checkpoint many times. pygame has only one
+    display, so ai_game should be headless too.
+    """
+    if snapshot is None:
+        snapshot = take(ai_game)
+    games = []
+    for _ in range(count):
+        settings = Settings()
+        settings.load_snapshot(ai_game.settings.snapshot())
+        game = AlienInvasion(headless=True, settings=settings, seed=ai_game.seed)
+        restore(game, snapshot)
+        games.append(game)
+    return games
+
+
+class SnapshotRing:
+    """A class to keep the most recent snapshots of a game for rewinding
+
+    Ring holds capacity snapshots taken every interval ticks, the oldest
+    snapshot is dropped when a new one arrives and the ring is full.
+    """
+
+    def __init__(self, capacity=600, interval=1):
+        """Initialize empty ring for capacity snapshots"""
+        self.capacity = capacity
+        self.interval = interval
+        self.snapshots = [None] * capacity
+        # index of newest snapshot and number of snapshots kept
+        self.newest = -1
+        self.count = 0
+
+    def __len__(self):
+        """Return number of snapshots kept"""
+        return self.count
+
+    def push(self, snapshot):
+        """Keep snapshot as the newest one"""
+        self.newest = (self.newest + 1) % self.capacity
+        self.snapshots[self.newest] = snapshot
+        self.count = min(self.count + 1, self.capacity)
+
+    def record(self, ai_game):
+        """Take snapshot of ai_game if its tick is on the interval, call after every tick"""
+        if ai_game.tick_count % self.interval == 0:
+            self.push(take(ai_game))
+
+    def get(self, back=0):
+        """Return snapshot taken back snapshots before the newest one"""
+        if not 0 <= back < self.count:
+            raise IndexError(f"only {self.count} snapshots kept")
+        return self.snapshots[(self.newest - back) % self.capacity]
+
+    def rewind(self, ai_game, back=0):
+        """Restore ai_game to snapshot back snapshots before the newest one
+
+        Newer snapshots are dropped, so recording again continues from there
+        """
+        snapshot = self.get(back)
+        self.newest = (self.newest - back) % self.capacity
+        self.count -= back
+        restore(ai_game, snapshot)
+
+    def clear(self):
+        """Drop every snapshot"""
+        self.snapshots = [None] * self.capacity
+        self.newest = -1
+        self.count = 0
+
+
+def _play(ai_game, player, ticks):
+    """Let player play ai_game for ticks ticks"""
+    for _ in range(ticks):
+        ai_game.step(player.act(ai_game))
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(
+        description="Measure snapshot size and speed and check that forked games match")
+    parser.add_argument("--ticks", type=int, default=3000, help="ticks played before checkpoint")
+    parser.add_argument("--forks", type=int, default=4, help="games forked from checkpoint")
+    parser.add_argument("--player", choices=sorted(PLAYERS), default="sweep",
+                        help="bot playing the games")
+    parser.add_argument("--backend", choices=("sprites", "numpy"), default="sprites",
+                        help="fleet backend")
+    parser.add_argument("--repeat", type=int, default=1000, help="snapshots timed")
+    args = parser.parse_args()
+
+    settings = Settings()
+    settings.fleet_backend = args.backend
+    settings.skip_pauses = True
+    game = AlienInvasion(headless=True, settings=settings, seed=0)
+    _play(game, PLAYERS[args.player](seed=0), args.ticks)
+    checkpoint = take(game)
+
+    start = perf_counter()
+    for _ in range(args.repeat):
+        take(game)
+    take_time = (perf_counter() - start) / args.repeat
+    start = perf_counter()
+    for _ in range(args.repeat):
+        restore(game, checkpoint)
+    restore_time = (perf_counter() - start) / args.repeat
+    print(f"snapshot {len(checkpoint)} bytes, {len(game.aliens)} aliens, "
+          f"{len(game.bullets)} bullets")
+    print(f"take {take_time * 1e6:.1f} us, restore {restore_time * 1e6:.1f} us")
+
+    # every fork played by the same bot from the checkpoint must end the same way
+    results = set()
+    for fork_game in [game] + fork(game, args.forks, checkpoint):
+        _play(fork_game, PLAYERS[args.player](seed=1), args.ticks)
+        results.add(take(fork_game))
+    print(f"{args.forks} forks played {args.ticks} more ticks, "
+          f"{'all match' if len(results) == 1 else 'MISMATCH'}")
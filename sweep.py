@@ -0,0 +1,177 @@
+import argparse  # Tools used to read command line options
+import itertools  # Tools used to build grid of settings
+import json  # Tools used to write results
+import multiprocessing  # Tools used to run games on every core
+import os  # Tools used to count cores and hide pygame greeting
+import random  # Tools used to sample random settings
+import time  # Tools used to time the sweep
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+from settings import Settings  # use settings module
+from alien_invasion import AlienInvasion  # use main game module
+from bot import PLAYERS  # use bot module
+
+
+def _parse_value(name, text):
+    """Turn text into the type of setting name"""
+    default = getattr(Settings(), name, None)
+    if default is None:
+        raise ValueError(f"unknown setting {name}")
+    # bool("False") is True, so true/false settings are spelled out
+    if isinstance(default, bool):
+        if text.lower() in ("true", "1"):
+            return True
+        if text.lower() in ("false", "0"):
+            return False
+        raise ValueError(f"{name} must be true, false, 1 or 0, not {text}")
+    return type(default)(text)
+
+
+def grid_settings(grid):
+    """Return every combination of grid, a dictionary of setting name and list of values"""
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*grid.values())]
+
+
+def random_settings(ranges, samples, seed=None):
+    """Return samples random settings, ranges is a dictionary of setting name and (low, high)"""
+    rng = random.Random(seed)
+    result = []
+    for _ in range(samples):
+        params = {}
+        for name, (low, high) in ranges.items():
+            # whole number settings get whole numbers
+            if isinstance(low, int):
+                params[name] = rng.randint(low, high)
+            else:
+                params[name] = rng.uniform(low, high)
+        result.append(params)
+    return result
+
+
+def play_game(job):
+    """Play one headless game with settings of job and return its metrics
+
+    Runs in a worker process, job is a dictionary with params, seed, player,
+    max_ticks and curve_every
+    """
+    settings = Settings()
+    for name, value in job["params"].items():
+        setattr(settings, name, value)
+    # pauses after ship hits only waste time in a simulated game
+    settings.skip_pauses = True
+    ai_game = AlienInvasion(headless=True, settings=settings, seed=job["seed"])
+    bot = PLAYERS[job["player"]](job["seed"])
+
+    ai_game.step(("play",))
+    # dynamic settings are reset when game starts, so set them again after play
+    for name, value in job["params"].items():
+        setattr(settings, name, value)
+    # score sampled every curve_every ticks
+    score_curve = []
+    while ai_game.stats.game_active and ai_game.tick_count < job["max_ticks"]:
+        ai_game.step(bot.act(ai_game))
+        if ai_game.tick_count % job["curve_every"] == 0:
+            score_curve.append(ai_game.stats.score)
+    game_over = not ai_game.stats.game_active
+    return {
+        "params": job["params"],
+        "seed": job["seed"],
+        "player": job["player"],
+        "level": ai_game.stats.level,
+        "score": ai_game.stats.score,
+        "ticks": ai_game.tick_count,
+        "game_over": game_over,
+        # simulated seconds until the last ship was lost, None if game never ended
+        "seconds_to_game_over": ai_game.tick_count / settings.tick_rate if game_over else None,
+        "score_curve": score_curve,
+    }
+
+
+def run_sweep(param_sets, games=1, player="sweep", max_ticks=36000,
+              curve_every=600, processes=None, seed=0):
+    """Play games games for every settings in param_sets on a process pool, yield results"""
+    jobs = [{"params": params, "seed": seed + game, "player": player,
+             "max_ticks": max_ticks, "curve_every": curve_every}
+            for params in param_sets for game in range(games)]
+    pool = multiprocessing.Pool(processes)
+    try:
+        # results come back as soon as any game finishes
+        yield from pool.imap_unordered(play_game, jobs, chunksize=4)
+    finally:
+        # workers are stopped with close() and join(), SDL catches the SIGTERM
+        # that terminate() would send so terminated workers never exit
+        pool.close()
+        pool.join()
+
+
+def summarize(results):
+    """Return average level, score and time to game over for every settings"""
+    groups = {}
+    for result in results:
+        key = json.dumps(result["params"], sort_keys=True)
+        groups.setdefault(key, []).append(result)
+    summary = []
+    for key, group in groups.items():
+        over = [r["seconds_to_game_over"] for r in group if r["game_over"]]
+        summary.append({
+            "params": json.loads(key),
+            "games": len(group),
+            "mean_level": sum(r["level"] for r in group) / len(group),
+            "max_level": max(r["level"] for r in group),
+            "mean_score": sum(r["score"] for r in group) / len(group),
+            "game_over_rate": len(over) / len(group),
+            "mean_seconds_to_game_over": sum(over) / len(over) if over else None,
+        })
+    return summary
+
+
+def _parse_assignments(items, ranges=False):
+    """Turn name=v1,v2 (or name=low:high when ranges) options into a dictionary"""
+    result = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        if ranges:
+            low, high = values.split(":")
+            result[name] = (_parse_value(name, low), _parse_value(name, high))
+        else:
+            result[name] = [_parse_value(name, value) for value in values.split(",")]
+    return result
+
+
+if __name__ == "__main__":  # If file is called directly
+    parser = argparse.ArgumentParser(description="Sweep Alien Invasion settings with headless games")
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2",
+                        help="setting and values to try, every combination is played")
+    parser.add_argument("--random", action="append", default=[], metavar="NAME=LOW:HIGH",
+                        help="setting and range to sample from, used with --samples")
+    parser.add_argument("--samples", type=int, default=20, help="random settings to sample")
+    parser.add_argument("--games", type=int, default=4, help="games per settings")
+    parser.add_argument("--player", default="sweep", choices=list(PLAYERS))
+    parser.add_argument("--max-ticks", type=int, default=36000,
+                        help="longest game in ticks (default 5 minutes at 120 ticks per second)")
+    parser.add_argument("--curve-every", type=int, default=600, help="ticks between score samples")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="sweep_results.jsonl",
+                        help="file every game result is written to as a JSON line")
+    args = parser.parse_args()
+
+    if args.random:
+        param_sets = random_settings(_parse_assignments(args.random, ranges=True),
+                                     args.samples, args.seed)
+    else:
+        param_sets = grid_settings(_parse_assignments(args.grid))
+
+    start = time.perf_counter()
+    results = []
+    with open(args.output, "w") as file:
+        for result in run_sweep(param_sets, args.games, args.player, args.max_ticks,
+                                args.curve_every, args.processes, args.seed):
+            file.write(json.dumps(result) + "\n")
+            results.append(result)
+    elapsed = time.perf_counter() - start
+
+    for row in summarize(results):
+        print(json.dumps(row))
+    print(f"{len(results)} games in {elapsed:.1f} s "
+          f"({len(results) / elapsed * 60:.0f} games per minute)")
@@ -0,0 +1,98 @@
+import pygame
+
+
+def glyph_cache(assets, font, text_color, bg_color):
+    """Return GlyphCache for font and colors shared through assets, create it on first use
+
+    Caches are kept by the game's Assets so they are freed with the game
+    """
+    key = (font, text_color, bg_color)
+    cache = assets.glyph_caches.get(key)
+    if cache is None:
+        cache = GlyphCache(font, text_color, bg_color)
+        assets.glyph_caches[key] = cache
+    return cache
+
+
+class GlyphCache:
+    """A class to render each character and label once for a font and colors"""
+
+    def __init__(self, font, text_color, bg_color, chars="0123456789,"):
+        """Render digits and comma used by scores and levels"""
+        self.font = font
+        self.text_color = text_color
+        self.bg_color = bg_color
+        # rendered character is the value and the character is the key
+        self.glyphs = {}
+        # whole rendered labels such as button messages
+        self.labels = {}
+        for char in chars:
+            self.glyph(char)
+        self.height = font.get_height()
+
+    def glyph(self, char):
+        """Return rendered image of char, render it on first use"""
+        image = self.glyphs.get(char)
+        if image is None:
+            image = self.font.render(char, True, self.text_color, self.bg_color)
+            self.glyphs[char] = image
+        return image
+
+    def label(self, text):
+        """Return rendered image of whole text, render it on first use"""
+        image = self.labels.get(text)
+        if image is None:
+            image = self.font.render(text, True, self.text_color, self.bg_color)
+            self.labels[text] = image
+        return image
+
+
+class TextImage:
+    """A class for an image of short text built from cached glyphs
+
+    When new text has the same length and glyph widths as the old text only
+    the characters that changed are drawn again, otherwise the image is rebuilt.
+    Changed characters are drawn onto a copy, an image once handed out is never
+    drawn over, so a frame queued on another thread keeps the text it was queued with
+    """
+
+    def __init__(self, glyphs):
+        """Initialize empty text image using GlyphCache glyphs"""
+        self.glyphs = glyphs
+        self.text = None
+        self.image = None
+        # x position of every character in image
+        self.offsets = []
+
+    def set_text(self, text):
+        """Change text of image and return the image"""
+        if text == self.text:
+            return self.image
+        glyph = self.glyphs.glyph
+        if self.text is not None and len(text) == len(self.text):
+            changed = [i for i, (old, new) in enumerate(zip(self.text, text)) if old != new]
+            # changed characters can only be drawn in place if they are as wide as the old ones
+            if all(glyph(text[i]).get_width() == glyph(self.text[i]).get_width()
+                   for i in changed):
+                image = self.image.copy()
+                for i in changed:
+                    image.blit(glyph(text[i]), (self.offsets[i], 0))
+                self.image = image
+                self.text = text
+                return self.image
+        self._build(text)
+        return self.image
+
+    def _build(self, text):
+        """Build new image of text from glyphs"""
+        images = [self.glyphs.glyph(char) for char in text]
+        width = sum(image.get_width() for image in images)
+        self.image = pygame.Surface((max(width, 1), self.glyphs.height))
+        self.image.fill(self.glyphs.bg_color)
+        self.offsets = []
+        x = 0
+        for image in images:
+            self.offsets.append(x)
+            self.image.blit(image, (x, 0))
+            x += image.get_width()
+        self.text = text
@@ -0,0 +1,77 @@
+# kinds of aliens, letter used in wave formations is the key
+# channels reorders red, green and blue of the alien image so each kind has its own color
+# points multiplies alien_points when an alien of that kind is shot
+ALIEN_KINDS = {
+    "a": {"channels": (0, 1, 2), "points": 1},  # green
+    "b": {"channels": (1, 0, 2), "points": 2},  # red
+    "c": {"channels": (0, 2, 1), "points": 3},  # blue
+}
+
+# wave formations, rows of letters laid over the fleet grid
+# a letter places an alien of that kind and "." leaves the cell empty
+# rows and columns repeat until the grid that fits on screen is filled
+WAVES = {
+    "grid": ("a",),
+    "mixed": ("c", "b", "a"),
+    "checker": ("a.", ".a"),
+    "columns": ("b.a.",),
+    "stripes": ("a", "."),
+    "diamond": ("..c..", ".bab.", "ba.ab", ".bab."),
+}
+
+
+def kind_image(assets, kind):
+    """Return shared image of alien kind from assets"""
+    return assets.get_recolored("Images/alien.bmp", ALIEN_KINDS[kind]["channels"])
+
+
+# layouts already computed, key is screen size, alien size, ship height and wave name
+_layouts = {}
+
+
+def fleet_layout(settings, alien_size, ship_height, wave):
+    """Return shared FleetLayout of wave for screen and image sizes, compute it on first use"""
+    key = (settings.screen_width, settings.screen_height, alien_size, ship_height, wave)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = FleetLayout(settings.screen_width, settings.screen_height,
+                             alien_size, ship_height, WAVES[wave])
+        _layouts[key] = layout
+    return layout
+
+
+class FleetLayout:
+    """A class for the position table of one wave formation on one screen size
+
+    Table is computed once and every fleet of that wave is placed by copying
+    it, so spawning a wave does no layout math.
+    """
+
+    def __init__(self, screen_width, screen_height, alien_size, ship_height, rows):
+        """Fit grid of aliens on screen and place formation rows on it"""
+        alien_width, alien_height = alien_size
+        # calculate horizontal space for aliens to distance each other
+        # amount of aliens drawn must appear on screen width
+        space_x = screen_width - (2 * alien_width)
+        # calculate how many aliens to fit in row
+        self.num_alien_x = space_x // (2 * alien_width)
+        # determine number of rows to fit on screen
+        space_y = screen_height - (3 * alien_height) - ship_height
+        self.num_row = space_y // (2 * alien_height)
+
+        # column, row, x, y and kind of every alien, row by row
+        self.slots = []
+        for row in range(self.num_row):
+            pattern = rows[row % len(rows)]
+            for col in range(self.num_alien_x):
+                kind = pattern[col % len(pattern)]
+                if kind == ".":
+                    continue
+                # each alien is 1 alien width apart with 1 alien height between rows
+                x = alien_width + 2 * alien_width * col
+                y = alien_height + 2 * alien_height * row
+                self.slots.append((col, row, x, y, kind))
+
+    def __len__(self):
+        """Return number of aliens in layout"""
+        return len(self.slots)